@@ -0,0 +1,84 @@
+# ----------------------------
+# Imports
+# ----------------------------
+
+import sys
+import types
+
+# ----------------------------
+# Fake Pixel Backend
+# ----------------------------
+
+class FakePixels(list):
+    """
+    Stand-in for neopixel.NeoPixel that keeps frames in memory instead of driving GPIO.
+
+    Every show() is counted, and on_show (if set) is called afterwards so a
+    benchmark can stop an endless animation after a fixed number of frames.
+    """
+    def __init__(self, pin, num_leds, brightness=1, auto_write=False, **kwargs):
+        super().__init__([(0, 0, 0)] * num_leds)
+        self.pin = pin
+        self.brightness = brightness
+        self.auto_write = auto_write
+        self.show_count = 0
+        self.on_show = None
+
+    def fill(self, color):
+        self[:] = [tuple(color)] * len(self)
+
+    def show(self):
+        self.show_count += 1
+        if self.on_show:
+            self.on_show(self)
+
+
+class FakeSPI:
+    """
+    Stand-in for busio.SPI that records every transfer instead of driving MOSI.
+    """
+    def __init__(self, clock=None, MOSI=None, MISO=None):
+        self.locked = False
+        self.baudrate = None
+        self.writes = []
+        self.keep_writes = True  # Turn off when benchmarking to avoid holding every frame
+
+    def try_lock(self):
+        if self.locked:
+            return False
+        self.locked = True
+        return True
+
+    def unlock(self):
+        self.locked = False
+
+    def configure(self, baudrate=100000, polarity=0, phase=0, bits=8):
+        self.baudrate = baudrate
+
+    def write(self, buffer):
+        if self.keep_writes:
+            self.writes.append(bytes(buffer))
+
+    def deinit(self):
+        pass
+
+
+def install():
+    """
+    Register fake board, busio and neopixel modules so src.led_configuration imports without GPIO.
+
+    Must be called before anything imports src.led_configuration.
+    """
+    board = types.ModuleType("board")
+    board.D10 = "D10"
+    board.MOSI = "D10"
+    board.SCK = "D11"
+    sys.modules["board"] = board
+
+    busio = types.ModuleType("busio")
+    busio.SPI = FakeSPI
+    sys.modules["busio"] = busio
+
+    neopixel = types.ModuleType("neopixel")
+    neopixel.NeoPixel = FakePixels
+    sys.modules["neopixel"] = neopixel
@@ -0,0 +1,368 @@
+"""
+Offline benchmarks for the calendar parser, schedule logic and LED frame generation.
+
+Runs without GPIO, a browser or network access: the parser reads saved calendar
+HTML from benchmarks/fixtures, schedules are generated, and frames go to a fake
+pixel backend. Results are compared against the baseline saved for this machine
+and the run fails if any benchmark regresses beyond the threshold.
+
+Usage:
+    python -m benchmarks.run_benchmarks                  # compare against baseline
+    python -m benchmarks.run_benchmarks --save-baseline  # record a new baseline
+    python -m benchmarks.run_benchmarks -k fade          # only matching benchmarks
+"""
+
+# ----------------------------
+# Imports
+# ----------------------------
+
+import argparse
+import json
+import logging
+import platform
+import sys
+import time
+import tracemalloc
+import types
+from datetime import date, timedelta
+from pathlib import Path
+
+from benchmarks import fake_hardware
+
+fake_hardware.install()
+
+from src import led_configuration  # noqa: E402
+from src.get_collection_information import parse_calendar_html  # noqa: E402
+from src.handle_schedule import has_valid_collections  # noqa: E402
+from src.schedule_inference import evaluate_rules, flatten_schedule, infer_rules, predict_schedule  # noqa: E402
+from src.spi_pixels import SpiPixels, decode_spi_frame  # noqa: E402
+
+# ----------------------------
+# Configuration and Constants
+# ----------------------------
+
+BENCHMARK_DIR = Path(__file__).parent
+FIXTURES_DIR = BENCHMARK_DIR / "fixtures"
+BASELINE_FILE = BENCHMARK_DIR / "baselines.json"
+
+DEFAULT_THRESHOLD = 0.2  # Allowed slowdown / memory growth before failing (20%)
+DEFAULT_MIN_TIME = 1.0  # Seconds to spend timing each benchmark
+
+# Registered benchmarks: name -> setup function returning the operation to time
+BENCHMARKS = {}
+
+# ----------------------------
+# Utility Functions
+# ----------------------------
+
+def benchmark(name):
+    """
+    Register a setup function that returns the callable to benchmark.
+
+    Args:
+        name (str): Name of the benchmark in reports and baselines.
+    """
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def make_schedule(start, weeks, empty=False):
+    """
+    Generate a synthetic schedule in the format saved by save_schedule.
+
+    Garbage and organics are collected every Wednesday and recycling every other
+    Wednesday. A holiday on the first Monday of each month pushes that week's
+    collection to Thursday.
+
+    Args:
+        start (date): First day of the schedule.
+        weeks (int): Number of weeks to generate.
+        empty (bool): Leave every day empty except the very last one.
+
+    Returns:
+        dict: Weeks keyed by their first date, each a list of daily schedules.
+    """
+    schedule = {}
+    for week in range(weeks):
+        week_start = start + timedelta(weeks=week)
+        days = [week_start + timedelta(days=i) for i in range(7)]
+        holiday = next((d for d in days if d.weekday() == 0 and d.day <= 7), None)
+        collection_day = next(d for d in days if d.weekday() == (3 if holiday else 2))
+
+        daily_schedules = []
+        for day in days:
+            collections = []
+            if not empty:
+                if day == holiday:
+                    collections = ["holiday"]
+                elif day == collection_day:
+                    collections = ["garbage", "organics"] + (["recycling"] if week % 2 == 0 else [])
+            daily_schedules.append({"date": day.isoformat(), "collections": collections})
+        schedule[week_start.isoformat()] = daily_schedules
+
+    if empty:
+        schedule[week_start.isoformat()][-1]["collections"] = ["garbage"]
+    return schedule
+
+
+def run_animation_frames(name, params, frames):
+    """
+    Build an operation that starts an animation and renders a fixed number of frames.
+
+    Args:
+        name (str): Animation name as passed to set_animation.
+        params (dict): Animation parameters.
+        frames (int): Compositor ticks to render.
+
+    Returns:
+        callable: The operation to benchmark.
+    """
+    def operation():
+        led_configuration.apply_animation(name, params)
+        for _ in range(frames):
+            led_configuration.draw_frame()
+
+    return operation
+
+
+def measure(operation, min_time):
+    """
+    Time an operation and record its peak memory.
+
+    Args:
+        operation (callable): The operation to run.
+        min_time (float): Minimum number of seconds to keep running it.
+
+    Returns:
+        dict: Operations per second and peak traced memory in KiB.
+    """
+    operation()  # Warm up
+
+    tracemalloc.start()
+    operation()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    count = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < min_time:
+        operation()
+        count += 1
+        elapsed = time.perf_counter() - start
+
+    return {"ops_per_sec": count / elapsed, "peak_kib": peak / 1024}
+
+
+def load_baselines():
+    if BASELINE_FILE.exists():
+        with open(BASELINE_FILE, "r") as f:
+            return json.load(f)
+    return {}
+
+
+def save_baselines(baselines):
+    with open(BASELINE_FILE, "w") as f:
+        json.dump(baselines, f, indent=4, sort_keys=True)
+
+# ----------------------------
+# Benchmarks
+# ----------------------------
+
+@benchmark("parse_calendar_html")
+def bench_parse_calendar_html():
+    content = (FIXTURES_DIR / "calendar_month.html").read_text()
+    return lambda: parse_calendar_html(content)
+
+
+@benchmark("has_valid_collections_3y_worst_case")
+def bench_has_valid_collections():
+    schedule = make_schedule(date(2024, 1, 1), weeks=156, empty=True)
+    return lambda: has_valid_collections(schedule)
+
+
+@benchmark("update_leds_today_3y")
+def bench_update_leds_today():
+    today = date.today()
+    schedule = make_schedule(today - timedelta(weeks=78), weeks=156)
+    led_configuration.load_schedule = lambda: schedule
+    return led_configuration.update_leds_today
+
+
+@benchmark("frame_set_leds")
+def bench_set_leds():
+    params = {"collection_state": {"garbage_on": True, "organics_on": False, "recycling_on": True}}
+    return run_animation_frames('set_leds', params, frames=1)
+
+
+@benchmark("frame_set_holiday_lights")
+def bench_set_holiday_lights():
+    return run_animation_frames('set_holiday_lights', {}, frames=1)
+
+
+@benchmark("cycle_pulsate_white")
+def bench_pulsate_white():
+    steps = 50
+    return run_animation_frames('pulsate_white', {}, frames=led_configuration.ticks(2 * (steps + 1) * 0.05))
+
+
+@benchmark("cycle_blink_red_and_turn_off")
+def bench_blink_red_and_turn_off():
+    return run_animation_frames('blink_red_and_turn_off', {}, frames=10 * led_configuration.ticks(0.5))
+
+
+@benchmark("cycle_fade_to_color")
+def bench_fade_to_color():
+    steps = 100
+    params = {
+        "fade_state": {
+            "collections": ["garbage", "recycling"],
+            "base_color": led_configuration.COLOR_WHITE,
+            "steps": steps,
+            "interval": 0.02,
+        }
+    }
+    ticks = led_configuration.ticks
+    frames = ticks(1) + 4 * ticks((steps + 1) * 0.02) + ticks(5)
+    return run_animation_frames('fade_to_color', params, frames=frames)
+
+
+@benchmark("tick_fade_to_color_with_heartbeat_overlay")
+def bench_fade_with_overlay():
+    params = {
+        "fade_state": {
+            "collections": ["garbage", "organics", "recycling"],
+            "base_color": led_configuration.COLOR_WHITE,
+            "steps": 100,
+            "interval": 0.02,
+        }
+    }
+    led_configuration.apply_animation('fade_to_color', params)
+    led_configuration.animation_manager.set_overlay('heartbeat', 'recycling', 'add')
+    return led_configuration.draw_frame
+
+
+@benchmark("tick_static_idle")
+def bench_static_idle():
+    led_configuration.compositor.clear_layers()
+    led_configuration.apply_animation('set_holiday_lights', {})
+    led_configuration.draw_frame()
+    return led_configuration.draw_frame
+
+
+@benchmark("infer_rules_3y")
+def bench_infer_rules():
+    history = flatten_schedule(make_schedule(date(2024, 1, 1), weeks=156))
+    accuracy = evaluate_rules(infer_rules(history), history)["accuracy"]
+    assert accuracy == 1.0, f"Inferred rules only reproduce {accuracy:.1%} of the recorded history"
+    return lambda: infer_rules(history)
+
+
+@benchmark("predict_schedule_12w")
+def bench_predict_schedule():
+    rules = infer_rules(flatten_schedule(make_schedule(date(2024, 1, 1), weeks=156)))
+    return lambda: predict_schedule(rules, date(2027, 1, 1))
+
+
+def make_spi_pixels():
+    """
+    Create an SPI strip on a fake SPI device and check its output decodes to the pixels set.
+    """
+    spi = fake_hardware.FakeSPI()
+    strip = SpiPixels(spi, led_configuration.NUM_LEDS)
+    expected = [((i * 5) % 256, (i * 11) % 256, (i * 17) % 256) for i in range(len(strip))]
+    for index, color in enumerate(expected):
+        strip[index] = color
+    strip.show()
+    assert decode_spi_frame(spi.writes[-1], len(strip)) == expected, "SPI frame does not decode to the pixels set"
+    spi.keep_writes = False
+    return strip
+
+
+@benchmark("spi_set_pixels_and_show")
+def bench_spi_set_pixels_and_show():
+    strip = make_spi_pixels()
+    colors = [led_configuration.COLOR_GARBAGE, led_configuration.COLOR_ORGANIC, led_configuration.COLOR_RECYCLING]
+
+    def operation():
+        for index in range(len(strip)):
+            strip[index] = colors[index % 3]
+        strip.show()
+
+    return operation
+
+
+@benchmark("spi_fill_and_show")
+def bench_spi_fill_and_show():
+    strip = make_spi_pixels()
+
+    def operation():
+        strip.fill(led_configuration.COLOR_HOLIDAY)
+        strip.show()
+
+    return operation
+
+# ----------------------------
+# Main Execution
+# ----------------------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-k", dest="pattern", default="", help="Only run benchmarks whose name contains this")
+    parser.add_argument("--save-baseline", action="store_true", help="Store results as this machine's baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed regression as a fraction (default: %(default)s)")
+    parser.add_argument("--min-time", type=float, default=DEFAULT_MIN_TIME,
+                        help="Seconds to time each benchmark (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    # Keep log formatting and I/O out of the measurements, and never actually sleep between frames
+    logging.disable(logging.INFO)
+    led_configuration.time = types.SimpleNamespace(sleep=lambda seconds: None, monotonic=time.monotonic)
+
+    machine = platform.node() or "default"
+    baselines = load_baselines()
+    baseline = baselines.get(machine, {})
+    results = {}
+    regressions = []
+
+    print(f"{'benchmark':40} {'ops/sec':>12} {'peak KiB':>10} {'vs baseline':>12}")
+    for name, setup in BENCHMARKS.items():
+        if args.pattern not in name:
+            continue
+
+        result = measure(setup(), args.min_time)
+        results[name] = result
+
+        change = ""
+        previous = baseline.get(name)
+        if previous:
+            speed = result["ops_per_sec"] / previous["ops_per_sec"] - 1
+            change = f"{speed:+.1%}"
+            if speed < -args.threshold:
+                regressions.append(f"{name}: {speed:+.1%} ops/sec")
+            if result["peak_kib"] > previous["peak_kib"] * (1 + args.threshold) + 1:
+                regressions.append(f"{name}: peak memory {previous['peak_kib']:.1f} -> {result['peak_kib']:.1f} KiB")
+
+        print(f"{name:40} {result['ops_per_sec']:12.1f} {result['peak_kib']:10.1f} {change:>12}")
+
+    if args.save_baseline:
+        baselines[machine] = {**baseline, **results}
+        save_baselines(baselines)
+        print(f"Saved baseline for '{machine}' to {BASELINE_FILE}")
+        return 0
+
+    if not baseline:
+        print(f"No baseline for '{machine}'. Run with --save-baseline to record one.")
+    if regressions:
+        print("\nRegressions beyond threshold:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,6 @@
+# Lets the tests import src and benchmarks from the repository root, and swaps
+# in the fake board/busio/neopixel modules so nothing needs GPIO.
+
+from benchmarks import fake_hardware
+
+fake_hardware.install()
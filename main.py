@@ -1,16 +1,29 @@
+import time
+
+# Reference point for time-to-first-correct-frame, taken before the slow imports below
+PROCESS_START = time.monotonic()
+
 # ----------------------------
 # Imports
 # ----------------------------
 
 import logging
-import time
 from datetime import datetime, timedelta
 import threading
 import atexit
 
 from src.get_collection_information import scrape_with_playwright
-from src.handle_schedule import save_schedule, load_schedule
-from src.led_configuration import update_leds_today, animation_manager
+from src.handle_schedule import (
+    save_schedule, load_schedule, has_valid_collections, update_history, load_history, save_rules, load_rules,
+    update_lock, get_scraped_schedule, schedule_covers_date,
+)
+from src.led_configuration import update_leds_today, animation_manager, start_animation_thread
+from src.control_server import start_control_server
+from src.profiling import install_signal_handlers
+from src.schedule_inference import (
+    infer_rules, evaluate_rules, rules_are_current, rules_are_trusted, extend_schedule, flatten_schedule,
+)
+from src.schedule_share import SHARE_MODE, SHARE_URL, fetch_shared_schedule, start_schedule_share_server
 
 # ----------------------------
 # Configuration
@@ -62,72 +75,207 @@ def is_beginning_or_end_of_month():
     last_day = (first_day + timedelta(days=31)).replace(day=1) - timedelta(days=1)
     return today == first_day or today == last_day
 
-def has_valid_collections(collections):
+def is_fetch_due():
+    """
+    Check whether new data should be fetched without being forced.
+
+    Current recurrence rules make fetching unnecessary. Rules that were accurate
+    but are due for validation trigger a fetch. Otherwise data is fetched at the
+    beginning or end of the month.
+
+    Returns:
+        bool: True if new data should be fetched.
+    """
+    rules = load_rules()
+    if rules_are_current(rules):
+        return False
+    if rules_are_trusted(rules):
+        logger.info("Schedule rules are due for validation.")
+        return True
+    return is_beginning_or_end_of_month()
+
+def fetch_collections():
+    """
+    Fetch new collection data, preferring a publishing node on the LAN when subscribed.
+
+    Falls back to scraping locally if the shared schedule is unavailable, empty
+    or doesn't cover today (the publisher hasn't scraped recently).
+
+    Returns:
+        dict: The collection schedule data.
+    """
+    if SHARE_MODE == "subscribe" and SHARE_URL:
+        collections = fetch_shared_schedule(SHARE_URL)
+        if collections and has_valid_collections(collections) and \
+                schedule_covers_date(collections, datetime.now().date()):
+            return collections
+        logger.warning("Shared schedule unavailable or out of date. Falling back to local scrape...")
+
+    return scrape_with_playwright()
+
+def save_and_learn_schedule(collections):
     """
-    Check if the collections data contains any non-empty collections.
+    Save freshly fetched data, learn recurrence rules from it and extend it with predictions.
+
+    The previous rules are validated against fetched days that were not yet in
+    the history, so they are only ever scored on days they were not inferred
+    from, before being replaced by rules inferred from the full history. Without
+    previous rules or new days there is nothing to validate against, and the new
+    rules keep the previous validation (if any). Days marked as predicted (e.g.
+    in a shared or previously saved schedule) are never learned from.
+
+    Args:
+        collections (dict): The fetched collection schedule.
+
+    Returns:
+        dict: The schedule as saved, extended with predicted weeks if the rules are current.
+    """
+    collections = get_scraped_schedule(collections)
+    if has_valid_collections(collections):
+        recorded = load_history()
+        new_days = {d: c for d, c in flatten_schedule(collections).items() if d not in recorded}
+        history = update_history(collections)
+        previous_rules = load_rules()
+        rules = infer_rules(history)
+
+        if previous_rules and new_days:
+            validation = evaluate_rules(previous_rules, new_days)
+            logger.info(f"Previous schedule rules predicted {validation['correct']}/{validation['days']} "
+                        f"newly fetched days correctly.")
+            for mismatch in validation["mismatches"]:
+                logger.info(f"  {mismatch['date']}: fetched {mismatch['expected']}, predicted {mismatch['predicted']}")
+            rules["accuracy"] = validation["accuracy"]
+            rules["validated_at"] = datetime.now().isoformat()
+        elif previous_rules and "validated_at" in previous_rules:
+            logger.info("No newly fetched days to validate the schedule rules on. Keeping the last validation.")
+            rules["accuracy"] = previous_rules["accuracy"]
+            rules["validated_at"] = previous_rules["validated_at"]
+        else:
+            logger.info("Schedule rules not validated yet. They will be checked against the next new days fetched.")
+        save_rules(rules)
+
+        if rules_are_current(rules):
+            collections = extend_schedule(collections, rules)
+
+    save_schedule(collections)
+    return collections
+
+def fetch_and_learn_schedule(cached_collections=None):
+    """
+    Fetch new collection data and save it with save_and_learn_schedule.
+
+    When the LEDs are showing cached_collections, a fetch without any
+    collections is discarded instead of overwriting the cached schedule.
 
     Args:
-        collections (dict): The collections data.
+        cached_collections (dict): Schedule the LEDs are currently showing.
 
     Returns:
-        bool: True if there is at least one valid collection.
+        dict: The schedule as saved, or None if the fetch was discarded.
     """
-    logger.debug("Validating collections...")
-    for week_key, daily_schedules in collections.items():
-        for daily_schedule in daily_schedules:
-            if len(daily_schedule.get("collections", [])) > 0:
-                logger.debug(f"Valid collection found: {daily_schedule['collections']}")
-                return True
-    return False  # No valid collections found
+    collections = fetch_collections()
+    if cached_collections is not None and not has_valid_collections(get_scraped_schedule(collections or {})):
+        logger.warning("Fetched schedule has no collections. Keeping the cached schedule.")
+        return None
+    return save_and_learn_schedule(collections)
 
 # ----------------------------
 # Main Functions
 # ----------------------------
 
-def fetch_or_load_and_update_leds(force_fetch=False):
+def fetch_or_load_and_update_leds(force_fetch=False, cached_collections=None):
     """
     Load the schedule or fetch new data if necessary and update LEDs.
 
     Conditions for fetching new data:
-    - It's the beginning or end of the month.
+    - is_fetch_due: the schedule rules need validating, or there are no
+      current rules and it's the beginning or end of the month.
     - No valid data is found in the loaded schedule.
     - force_fetch is True.
+
+    While the schedule rules are current, the loaded schedule is extended with
+    predicted weeks instead of being fetched again.
+
+    When cached_collections is given the LEDs are already showing that schedule,
+    so the pulsating progress effect is skipped, the LEDs are only updated if the
+    new data differs, and a failed fetch leaves the current display in place.
+
+    Only one call runs at a time; others wait for it to finish.
+
     Args:
         force_fetch (bool): Whether to force a fetch of new data.
+        cached_collections (dict): Schedule the LEDs are currently showing.
     """
-    try:
-        logger.info("Starting pulsating white effect while processing data...")
-        animation_manager.set_animation('pulsate_white')
-
-        # Decide whether to fetch or load based on conditions
-        if force_fetch or is_beginning_or_end_of_month():
-            logger.info("Fetching new collection data...")
-            collections = scrape_with_playwright()
-            save_schedule(collections)
-        else:
-            logger.info("Loading existing schedule data...")
-            collections = load_schedule()
-
-        # Validate the data (loaded or fetched)
-        if has_valid_collections(collections):
-            logger.info("Valid collections found. Updating LEDs...")
-            update_leds_today()
-        else:
-            logger.warning("No valid collections found. Re-fetching data...")
-            collections = scrape_with_playwright()
-            save_schedule(collections)
-
-            # Validate again after re-fetching
-            if has_valid_collections(collections):
-                logger.info("Valid collections found after re-fetching. Updating LEDs...")
+    with update_lock:
+        try:
+            if cached_collections is None:
+                logger.info("Starting pulsating white effect while processing data...")
+                animation_manager.set_animation('pulsate_white')
+
+            # Decide whether to fetch or load based on conditions
+            if force_fetch or is_fetch_due():
+                logger.info("Fetching new collection data...")
+                collections = fetch_and_learn_schedule(cached_collections)
+                if collections is None:
+                    logger.info("Keeping LEDs on the cached schedule.")
+                    return
+            else:
+                logger.info("Loading existing schedule data...")
+                collections = load_schedule()
+                rules = load_rules()
+                if rules_are_current(rules):
+                    extended = extend_schedule(collections, rules)
+                    if extended != collections:
+                        logger.info("Extending schedule with predicted collections...")
+                        collections = extended
+                        save_schedule(collections)
+
+            # Validate the data (loaded or fetched)
+            if cached_collections is not None and collections == cached_collections:
+                logger.info("Schedule unchanged from cached copy. Leaving LEDs as they are.")
+            elif has_valid_collections(collections):
+                logger.info("Valid collections found. Updating LEDs...")
                 update_leds_today()
             else:
-                logger.error("No valid collections found even after re-fetching. Turning off LEDs as a fallback.")
-                animation_manager.set_animation('blink_red_and_turn_off')
+                logger.warning("No valid collections found. Re-fetching data...")
+                collections = fetch_and_learn_schedule(cached_collections)
+                if collections is None:
+                    logger.info("Keeping LEDs on the cached schedule.")
+                    return
+
+                # Validate again after re-fetching
+                if has_valid_collections(collections):
+                    logger.info("Valid collections found after re-fetching. Updating LEDs...")
+                    update_leds_today()
+                else:
+                    logger.error("No valid collections found even after re-fetching. Turning off LEDs as a fallback.")
+                    animation_manager.set_animation('blink_red_and_turn_off')
+
+        except Exception as e:
+            logger.error(f"Failed to load, fetch, or update LEDs: {e}")
+            if cached_collections is not None:
+                logger.info("Keeping LEDs on the cached schedule.")
+            else:
+                animation_manager.set_animation('blink_red_and_turn_off')  # Turn off LEDs on failure
 
-    except Exception as e:
-        logger.error(f"Failed to load, fetch, or update LEDs: {e}")
-        animation_manager.set_animation('blink_red_and_turn_off')  # Turn off LEDs on failure
+def log_time_to_first_frame(timeout=30):
+    """
+    Wait for the current animation to be drawn and log how long it took since process start.
+
+    Args:
+        timeout (float): Maximum number of seconds to wait for the frame.
+
+    Returns:
+        float: Milliseconds from process start to the first correct frame, or None on timeout.
+    """
+    rendered_at = animation_manager.wait_for_render(timeout)
+    if rendered_at is None:
+        logger.warning(f"First correct frame not drawn within {timeout} seconds.")
+        return None
+
+    elapsed_ms = (rendered_at - PROCESS_START) * 1000
+    logger.info(f"Time to first correct frame: {elapsed_ms:.0f} ms")
+    return elapsed_ms
 
 def schedule_daily_run(hour=6, minute=0):
     """
@@ -159,15 +307,48 @@ def schedule_daily_run(hour=6, minute=0):
             fetch_or_load_and_update_leds()
 
     # Run the scheduler in a separate thread
-    scheduler_thread = threading.Thread(target=run_at_scheduled_time, daemon=True)
+    scheduler_thread = threading.Thread(target=run_at_scheduled_time, name="scheduler", daemon=True)
     scheduler_thread.start()
 
 def run_startup_process():
     """
-    Run the fetch_or_load_and_update_leds function on startup in a separate thread.
+    Run the startup process in a separate thread.
+
+    If the cached schedule covers today and has something to show, the LEDs are
+    set from it straight away and the fresh fetch runs afterwards, only touching
+    the LEDs if the schedule changed. Otherwise the LEDs pulsate while the
+    schedule is fetched.
+
+    Returns:
+        Thread: The running startup thread.
     """
-    startup_thread = threading.Thread(target=fetch_or_load_and_update_leds, args=(True,), daemon=True)
+    def startup():
+        cached_collections = load_schedule()
+        if has_valid_collections(cached_collections) and \
+                schedule_covers_date(cached_collections, datetime.now().date()):
+            generation = animation_manager.generation
+            update_leds_today()
+            if animation_manager.generation != generation:
+                logger.info("Showing cached schedule while fetching fresh data...")
+                log_time_to_first_frame()
+                fetch_or_load_and_update_leds(force_fetch=not rules_are_current(load_rules()),
+                                              cached_collections=cached_collections)
+                return
+            logger.info("Cached schedule has nothing to show.")
+        else:
+            logger.info("No cached schedule for today.")
+
+        # Only measure if the fetch replaced the pulsating progress effect with a result
+        generation = animation_manager.generation
+        fetch_or_load_and_update_leds(force_fetch=True)
+        if animation_manager.generation != generation and animation_manager.get_animation()[0] != 'pulsate_white':
+            log_time_to_first_frame()
+        else:
+            logger.info("Fetched schedule has nothing to show. Not logging time to first frame.")
+
+    startup_thread = threading.Thread(target=startup, name="startup", daemon=True)
     startup_thread.start()
+    return startup_thread
 
 # ----------------------------
 # Main Execution
@@ -176,6 +357,8 @@ def run_startup_process():
 if __name__ == "__main__":
     logger.info("Starting Garbage Collection Indicator...")
     animation_manager.set_animation('')
+    start_animation_thread()
+    install_signal_handlers()
 
     # Run the fetch and update process immediately on startup
     logger.info("Running startup process...")
@@ -185,6 +368,13 @@ if __name__ == "__main__":
     logger.info("Scheduling daily updates at 6:00 AM.")
     schedule_daily_run(hour=6, minute=0)
 
+    # Share this node's schedule with other indicators on the LAN
+    if SHARE_MODE == "publish":
+        start_schedule_share_server()
+
+    # Serve the local control API for status queries and on-demand refreshes
+    start_control_server(lambda: fetch_or_load_and_update_leds(force_fetch=True))
+
     # Keep the application running
     try:
         while True:
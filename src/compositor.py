@@ -0,0 +1,171 @@
+# ----------------------------
+# Imports
+# ----------------------------
+
+import logging
+from threading import Lock
+
+# ----------------------------
+# Configuration and Constants
+# ----------------------------
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+COLOR_OFF = (0, 0, 0)
+
+# ----------------------------
+# Blend Modes
+# ----------------------------
+
+def blend_normal(base, color, opacity):
+    if opacity >= 1.0:
+        return color
+    return tuple(int(b * (1 - opacity) + c * opacity) for b, c in zip(base, color))
+
+
+def blend_add(base, color, opacity):
+    return tuple(min(255, int(b + c * opacity)) for b, c in zip(base, color))
+
+
+def blend_multiply(base, color, opacity):
+    return tuple(int(b * (1 - opacity) + b * c / 255 * opacity) for b, c in zip(base, color))
+
+
+def blend_max(base, color, opacity):
+    return tuple(max(b, int(c * opacity)) for b, c in zip(base, color))
+
+
+BLEND_MODES = {
+    "normal": blend_normal,
+    "add": blend_add,
+    "multiply": blend_multiply,
+    "max": blend_max,
+}
+
+# ----------------------------
+# Compositor
+# ----------------------------
+
+class Layer:
+    """
+    One source of color drawn onto a set of pixels.
+
+    The source is either a fixed color tuple or a generator that yields, once
+    per tick, a color for the whole segment, a list with one color per pixel
+    (None leaves a pixel untouched), or None to draw nothing that tick.
+    """
+    def __init__(self, source, indices, blend="normal", opacity=1.0, z=0):
+        if blend not in BLEND_MODES:
+            raise ValueError(f"Unknown blend mode: {blend}")
+        self.source = source
+        self.indices = list(indices)
+        self.blend = BLEND_MODES[blend]
+        self.opacity = opacity
+        self.z = z
+        self.static = isinstance(source, tuple)
+
+
+class Compositor:
+    """
+    Combines named layers into a single frame per tick.
+
+    Layers are drawn bottom to top by z (then by when they were added), each
+    blended onto the layers below it. Generators that finish are removed.
+    """
+    def __init__(self, num_leds, background=COLOR_OFF):
+        self.num_leds = num_leds
+        self.background = background
+        self.lock = Lock()
+        self.layers = {}
+        self.changed = True  # Layers were added or removed since the last render
+        self.frame = None
+
+    def set_layer(self, name, source, indices=None, blend="normal", opacity=1.0, z=0):
+        """
+        Add a layer, replacing any layer with the same name.
+
+        Args:
+            name (str): Layer name.
+            source (tuple or generator): Fixed color or per-tick generator.
+            indices (list): Pixels the layer draws on, defaults to the whole strip.
+            blend (str): One of BLEND_MODES.
+            opacity (float): Strength of the layer (0.0 to 1.0).
+            z (int): Stacking order; higher layers are drawn on top.
+        """
+        layer = Layer(source, range(self.num_leds) if indices is None else indices, blend, opacity, z)
+        with self.lock:
+            self.layers.pop(name, None)
+            self.layers[name] = layer
+            self.changed = True
+
+    def remove_layer(self, name):
+        with self.lock:
+            if self.layers.pop(name, None) is not None:
+                self.changed = True
+
+    def clear_layers(self, prefix=""):
+        """
+        Remove every layer whose name starts with prefix.
+        """
+        with self.lock:
+            for name in [name for name in self.layers if name.startswith(prefix)]:
+                del self.layers[name]
+            self.changed = True
+
+    def layer_names(self):
+        with self.lock:
+            return list(self.layers)
+
+    def render(self):
+        """
+        Advance every layer by one tick and combine them into a frame.
+
+        Returns:
+            list: RGB tuples for the whole strip, or None if the frame is unchanged.
+
+        Raises:
+            Exception: Whatever a layer's generator raised. The caller decides how to recover.
+        """
+        with self.lock:
+            layers = sorted(self.layers.items(), key=lambda item: item[1].z)
+            changed = self.changed
+            self.changed = False
+
+        if not changed and all(layer.static for _, layer in layers):
+            return None
+
+        frame = [self.background] * self.num_leds
+        finished = []
+        for name, layer in layers:
+            if layer.static:
+                output = layer.source
+            else:
+                try:
+                    output = next(layer.source)
+                except StopIteration:
+                    finished.append((name, layer))
+                    continue
+
+            if output is None:
+                continue
+            blend, opacity = layer.blend, layer.opacity
+            if isinstance(output, tuple):
+                for index in layer.indices:
+                    frame[index] = blend(frame[index], output, opacity)
+            else:
+                for index, color in zip(layer.indices, output):
+                    if color is not None:
+                        frame[index] = blend(frame[index], color, opacity)
+
+        if finished:
+            with self.lock:
+                for name, layer in finished:
+                    if self.layers.get(name) is layer:
+                        del self.layers[name]
+                self.changed = True
+
+        if frame == self.frame:
+            return None
+        self.frame = frame
+        return frame
@@ -0,0 +1,308 @@
+# ----------------------------
+# Imports
+# ----------------------------
+
+import json
+import logging
+import os
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread, Lock, Timer
+from urllib.parse import urlparse
+
+from dotenv import load_dotenv
+
+from src.handle_schedule import SCHEDULE_FILE, get_schedule_age, update_lock
+from src.compositor import BLEND_MODES
+from src.led_configuration import (
+    ANIMATION_NAMES, OVERLAYS, SEGMENTS, animation_manager, check_animation, update_leds_today,
+)
+from src.profiling import PROFILE_WINDOW, dump_thread_stacks, profiler
+
+load_dotenv()
+
+# ----------------------------
+# Configuration and Constants
+# ----------------------------
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+# Only listen on the loopback interface unless told otherwise
+CONTROL_HOST = os.getenv("control_host", "127.0.0.1")
+CONTROL_PORT = int(os.getenv("control_port", "8321"))
+
+MAX_PREVIEW_DURATION = 24 * 60 * 60  # Longest preview before the schedule view is restored (seconds)
+
+# Set while an on-demand refresh is queued or running, checked and set under refresh_state_lock
+refresh_state_lock = Lock()
+refresh_pending = False
+
+# Timer restoring the schedule view after the current preview, replaced by each new preview
+preview_lock = Lock()
+preview_timer = None
+
+# ----------------------------
+# Utility Functions
+# ----------------------------
+
+def get_cache_info():
+    """
+    Describe the cached schedule file.
+
+    Returns:
+        dict: The cache path, whether it exists and its age in seconds.
+    """
+    age = get_schedule_age()
+    return {
+        "path": str(SCHEDULE_FILE),
+        "exists": age is not None,
+        "age_seconds": round(age, 1) if age is not None else None,
+    }
+
+
+def get_status():
+    """
+    Collect the current state of the indicator.
+
+    Returns:
+        dict: The current animation, its parameters, overlays, refresh state and cache info.
+    """
+    name, params = animation_manager.get_animation()
+    return {
+        "animation": name,
+        "params": params,
+        "overlays": animation_manager.get_overlays(),
+        "refresh_in_progress": refresh_pending or update_lock.locked(),
+        "cache": get_cache_info(),
+    }
+
+
+def start_refresh(refresh_function):
+    """
+    Run a refresh in a background thread unless one is already running.
+
+    The refresh function takes update_lock itself, so a refresh started by
+    startup or the daily run also counts as running. refresh_pending covers
+    the gap until the new thread takes update_lock, so concurrent requests
+    can't both start one.
+
+    Args:
+        refresh_function (callable): Function that fetches data and updates the LEDs.
+
+    Returns:
+        bool: True if a refresh was started, False if one was already running.
+    """
+    global refresh_pending
+
+    with refresh_state_lock:
+        if refresh_pending or update_lock.locked():
+            return False
+        refresh_pending = True
+
+    def run_refresh():
+        global refresh_pending
+        try:
+            logger.info("Running on-demand refresh...")
+            refresh_function()
+        finally:
+            with refresh_state_lock:
+                refresh_pending = False
+
+    Thread(target=run_refresh, name="control-refresh", daemon=True).start()
+    return True
+
+
+def preview_animation(name, params=None, duration=None):
+    """
+    Show an animation immediately, optionally restoring the schedule view afterwards.
+
+    A new preview cancels the previous preview's timer, so it can't restore
+    the schedule view partway through.
+
+    Args:
+        name (str): Name of the animation to show.
+        params (dict): Parameters for the animation.
+        duration (float): Seconds to show the animation before calling update_leds_today.
+    """
+    global preview_timer
+
+    with preview_lock:
+        if preview_timer is not None:
+            preview_timer.cancel()
+            preview_timer = None
+
+        animation_manager.set_animation(name, params)
+        if duration:
+            preview_timer = Timer(duration, update_leds_today)
+            preview_timer.daemon = True
+            preview_timer.start()
+
+# ----------------------------
+# Request Handler
+# ----------------------------
+
+class ControlRequestHandler(BaseHTTPRequestHandler):
+    """
+    Handles the local control API.
+
+    GET  /status         Current animation, refresh state and cache info.
+    GET  /cache          Cache file info.
+    POST /refresh        Force a fresh fetch in the background.
+    POST /preview        Show an animation: {"name": ..., "params": {...}, "duration": seconds}
+    POST /overlay        Draw an overlay: {"name": ..., "segment": ..., "blend": ..., "opacity": ...},
+                         or remove it: {"name": ..., "remove": true}
+    GET  /debug/stacks   Stack of every running thread.
+    GET  /debug/profile  Profiler state and the last profile's results.
+    POST /debug/profile  Start the sampling profiler: {"seconds": ...}, or {"stop": true}
+    """
+    refresh_function = None
+
+    def log_message(self, format, *args):
+        logger.debug(f"Control API: {format % args}")
+
+    def send_json(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_text(self, status, text):
+        data = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        body = json.loads(self.rfile.read(length))
+        if not isinstance(body, dict):
+            raise ValueError("expected a JSON object")
+        return body
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == "/status":
+            self.send_json(200, get_status())
+        elif path == "/cache":
+            self.send_json(200, get_cache_info())
+        elif path == "/debug/stacks":
+            self.send_text(200, dump_thread_stacks())
+        elif path == "/debug/profile":
+            self.send_json(200, {"running": profiler.is_running(), "last_result": profiler.last_result})
+        else:
+            self.send_json(404, {"error": f"Unknown path: {path}"})
+
+    def do_POST(self):
+        path = urlparse(self.path).path
+        try:
+            body = self.read_json()
+        except ValueError as e:
+            self.send_json(400, {"error": f"Invalid JSON body: {e}"})
+            return
+
+        if path == "/refresh":
+            if start_refresh(self.refresh_function):
+                self.send_json(202, {"status": "started"})
+            else:
+                self.send_json(409, {"status": "already running"})
+        elif path == "/preview":
+            name = body.get("name", "")
+            params = body.get("params", {})
+            if name not in ANIMATION_NAMES:
+                self.send_json(400, {"error": f"Unknown animation: {name}", "animations": ANIMATION_NAMES})
+                return
+            try:
+                check_animation(name, params)
+            except ValueError as e:
+                self.send_json(400, {"error": str(e)})
+                return
+            duration = body.get("duration")
+            if duration is not None:
+                try:
+                    duration = float(duration)
+                except (TypeError, ValueError):
+                    duration = None
+                if duration is None or not 0 < duration <= MAX_PREVIEW_DURATION:
+                    self.send_json(400, {"error": f"Invalid duration: {body.get('duration')}"})
+                    return
+            preview_animation(name, params, duration)
+            self.send_json(200, {"animation": name})
+        elif path == "/overlay":
+            name = body.get("name", "")
+            segment = body.get("segment", "all")
+            blend = body.get("blend", "add")
+            if not all(isinstance(value, str) for value in (name, segment, blend)) \
+                    or name not in OVERLAYS or segment not in SEGMENTS or blend not in BLEND_MODES:
+                self.send_json(400, {
+                    "error": f"Unknown overlay, segment or blend mode: {name}, {segment}, {blend}",
+                    "overlays": list(OVERLAYS),
+                    "segments": list(SEGMENTS),
+                    "blend_modes": list(BLEND_MODES),
+                })
+                return
+            if body.get("remove"):
+                animation_manager.clear_overlay(name)
+            else:
+                try:
+                    opacity = float(body.get("opacity", 1.0))
+                except (TypeError, ValueError):
+                    opacity = None
+                if opacity is None or not 0.0 <= opacity <= 1.0:
+                    self.send_json(400, {"error": f"Invalid opacity: {body.get('opacity')}"})
+                    return
+                animation_manager.set_overlay(name, segment, blend, opacity)
+            self.send_json(200, {"overlays": animation_manager.get_overlays()})
+        elif path == "/debug/profile":
+            if body.get("stop"):
+                profiler.stop()
+                self.send_json(200, {"status": "stopping"})
+                return
+            try:
+                seconds = float(body.get("seconds", PROFILE_WINDOW))
+            except (TypeError, ValueError):
+                seconds = None
+            if seconds is None or not 0 < seconds < float("inf"):
+                self.send_json(400, {"error": f"Invalid seconds: {body.get('seconds')}"})
+                return
+            if profiler.start(seconds):
+                self.send_json(202, {"status": "started"})
+            else:
+                self.send_json(409, {"status": "already running"})
+        else:
+            self.send_json(404, {"error": f"Unknown path: {path}"})
+
+# ----------------------------
+# Server Startup
+# ----------------------------
+
+def start_control_server(refresh_function, host=CONTROL_HOST, port=CONTROL_PORT):
+    """
+    Start the control API in a background thread.
+
+    Args:
+        refresh_function (callable): Function run by POST /refresh.
+        host (str): Interface to listen on.
+        port (int): Port to listen on.
+
+    Returns:
+        ThreadingHTTPServer: The running server, or None if it could not be started.
+    """
+    handler = type("BoundControlRequestHandler", (ControlRequestHandler,), {
+        "refresh_function": staticmethod(refresh_function),
+    })
+    try:
+        server = ThreadingHTTPServer((host, port), handler)
+    except OSError as e:
+        logger.error(f"Failed to start control API on {host}:{port}: {e}")
+        return None
+
+    server.daemon_threads = True
+    Thread(target=server.serve_forever, name="control-server", daemon=True).start()
+    logger.info(f"Control API listening on http://{host}:{port}")
+    return server
@@ -3,7 +3,11 @@
 # ----------------------------
 
 import json
+import os
+import time
+from datetime import date, timedelta
 from pathlib import Path
+from threading import Lock
 import logging
 
 # ----------------------------
@@ -14,11 +18,38 @@ import logging
 logger = logging.getLogger(__name__)
 
 SCHEDULE_FILE = Path("collection_schedule.json")  # Path to the schedule file
+HISTORY_FILE = Path("collection_history.json")  # Every scraped day, keyed by date
+RULES_FILE = Path("collection_rules.json")  # Inferred recurrence rules
+
+# Days older than this before the latest recorded day are dropped from the
+# history. Two years lets rule inference see each holiday at least twice.
+HISTORY_MAX_WEEKS = 104
+
+# Held while the schedule is being fetched and saved, so only one refresh
+# (startup, the daily run or the control API) writes the files at a time
+update_lock = Lock()
 
 # ----------------------------
 # Functions
 # ----------------------------
 
+def write_json(path, data):
+    """
+    Write JSON to a file atomically.
+
+    The data is written to a temporary file next to it, which then replaces the
+    original, so readers (e.g. the schedule share server) never see a partial file.
+
+    Args:
+        path (Path): The file to write.
+        data: The data to save.
+    """
+    temp_path = path.with_name(f".{path.name}.tmp")
+    with open(temp_path, "w") as f:
+        json.dump(data, f, indent=4)
+    os.replace(temp_path, path)
+
+
 def save_schedule(data):
     """
     Save the collection schedule to a JSON file.
@@ -26,9 +57,8 @@ def save_schedule(data):
     Args:
         data (dict): The collection schedule data to save.
     """
-    logger.info('SAVING DATA', data)
-    with open(SCHEDULE_FILE, "w") as f:
-        json.dump(data, f, indent=4)
+    logger.info(f"Saving schedule to {SCHEDULE_FILE}.")
+    write_json(SCHEDULE_FILE, data)
 
 
 def load_schedule():
@@ -42,4 +72,140 @@ def load_schedule():
     if SCHEDULE_FILE.exists():
         with open(SCHEDULE_FILE, "r") as f:
             return json.load(f)
-    return {}
\ No newline at end of file
+    return {}
+
+
+def get_schedule_age():
+    """
+    Get the age of the cached schedule file.
+
+    Returns:
+        float: Seconds since the schedule file was last written, or None
+               if the file does not exist.
+    """
+    try:
+        return time.time() - SCHEDULE_FILE.stat().st_mtime
+    except FileNotFoundError:
+        return None
+
+
+def has_valid_collections(collections):
+    """
+    Check if the collections data contains any non-empty collections.
+
+    Args:
+        collections (dict): The collections data.
+
+    Returns:
+        bool: True if there is at least one valid collection.
+    """
+    logger.debug("Validating collections...")
+    for week_key, daily_schedules in collections.items():
+        for daily_schedule in daily_schedules:
+            if len(daily_schedule.get("collections", [])) > 0:
+                logger.debug(f"Valid collection found: {daily_schedule['collections']}")
+                return True
+    return False  # No valid collections found
+
+
+def schedule_covers_date(collections, day):
+    """
+    Check if the collections data includes a given day.
+
+    Args:
+        collections (dict): The collections data.
+        day (date): The day to look for.
+
+    Returns:
+        bool: True if the schedule has an entry for that day.
+    """
+    day_str = day.isoformat()
+    return any(
+        daily_schedule.get("date") == day_str
+        for daily_schedules in collections.values()
+        for daily_schedule in daily_schedules
+    )
+
+
+def get_scraped_schedule(data):
+    """
+    Drop predicted days from a schedule, keeping only days read from the calendar.
+
+    Args:
+        data (dict): A collection schedule, possibly extended with predicted days.
+
+    Returns:
+        dict: The schedule without days marked as predicted.
+    """
+    scraped = {}
+    for week_key, daily_schedules in data.items():
+        days = [daily_schedule for daily_schedule in daily_schedules if not daily_schedule.get("predicted")]
+        if days:
+            scraped[week_key] = days
+    return scraped
+
+
+def update_history(data):
+    """
+    Merge scraped collection days into the recorded history.
+
+    Predicted days are ignored, so the history only ever holds what the
+    calendar actually showed. Days more than HISTORY_MAX_WEEKS before the
+    latest recorded day are dropped so the file stays bounded. Empty days
+    inside the window are kept, since rule inference counts them as weeks
+    and holidays with no collection.
+
+    Args:
+        data (dict): The scraped collection schedule.
+
+    Returns:
+        dict: The full history, collections keyed by date string.
+    """
+    history = load_history()
+    for daily_schedules in get_scraped_schedule(data).values():
+        for daily_schedule in daily_schedules:
+            history[daily_schedule["date"]] = daily_schedule.get("collections", [])
+
+    if history:
+        cutoff = (date.fromisoformat(max(history)) - timedelta(weeks=HISTORY_MAX_WEEKS)).isoformat()
+        history = {d: collections for d, collections in history.items() if d > cutoff}
+
+    write_json(HISTORY_FILE, dict(sorted(history.items())))
+    return history
+
+
+def load_history():
+    """
+    Load the recorded collection history.
+
+    Returns:
+        dict: Collections keyed by date string. Returns an empty dictionary
+              if the file does not exist.
+    """
+    if HISTORY_FILE.exists():
+        with open(HISTORY_FILE, "r") as f:
+            return json.load(f)
+    return {}
+
+
+def save_rules(rules):
+    """
+    Save the inferred recurrence rules to a JSON file.
+
+    Args:
+        rules (dict): The rules to save.
+    """
+    write_json(RULES_FILE, rules)
+
+
+def load_rules():
+    """
+    Load the inferred recurrence rules.
+
+    Returns:
+        dict: The saved rules, or None if the file does not exist.
+    """
+    if RULES_FILE.exists():
+        with open(RULES_FILE, "r") as f:
+            return json.load(f)
+    return None
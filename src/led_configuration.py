@@ -6,14 +6,20 @@ import atexit
 import json
 import logging
 import math
+import os
 import time
 from datetime import datetime, timedelta
-from threading import Thread, Lock
+from threading import Thread, Lock, Condition
 
 import board
 import neopixel
+from dotenv import load_dotenv
 
+from src.compositor import Compositor
 from src.handle_schedule import load_schedule
+from src.spi_pixels import SpiPixels
+
+load_dotenv()
 
 # ----------------------------
 # Configuration and Constants
@@ -26,6 +32,7 @@ logger = logging.getLogger(__name__)
 NUM_LEDS = 48  # Total number of LEDs in your strip
 PIN = board.D10  # GPIO pin connected to the LED strip
 BRIGHTNESS = 1  # Brightness (0.0 to 1.0)
+LED_BACKEND = os.getenv("led_backend", "neopixel").lower()  # "neopixel" or "spi" (PIN must be SPI MOSI)
 
 # Colors
 COLOR_WHITE = (255, 255, 255)
@@ -37,8 +44,50 @@ COLOR_RED = (255, 0, 0)
 COLOR_NO = (255, 165, 0)  # No collection
 COLOR_OFF = (0, 0, 0)
 
-# Set up the LED strip
-pixels = neopixel.NeoPixel(PIN, NUM_LEDS, brightness=BRIGHTNESS, auto_write=False)
+# Pixels belonging to each segment of the strip
+SEGMENTS = {
+    "all": list(range(NUM_LEDS)),
+    "garbage": list(range(0, 8)) + list(range(40, 48)),
+    "organics": list(range(8, 16)) + list(range(32, 40)),
+    "recycling": list(range(16, 32)),
+}
+
+FRAME_INTERVAL = 0.02  # Seconds per compositor tick (50 frames per second)
+ANIMATION_THREAD_NAME = "animations"
+
+# Limits on fade parameters accepted from outside (e.g. the control API)
+MAX_FADE_STEPS = 1000
+MAX_FADE_INTERVAL = 10.0  # Seconds per fade step
+
+# ----------------------------
+# LED Strip Setup
+# ----------------------------
+
+def create_pixels(backend=LED_BACKEND):
+    """
+    Create the LED strip for the configured output backend.
+
+    Args:
+        backend (str): "neopixel" for the CPU-driven write path, or "spi" to
+                       send each frame as a single SPI transfer on MOSI.
+
+    Returns:
+        The pixel strip, supporting fill(), item assignment and show().
+    """
+    if backend == "spi":
+        import busio  # Only needed for the SPI backend
+
+        logger.info("Using SPI LED backend.")
+        spi = busio.SPI(board.SCK, MOSI=board.MOSI)
+        return SpiPixels(spi, NUM_LEDS, brightness=BRIGHTNESS, auto_write=False)
+
+    return neopixel.NeoPixel(PIN, NUM_LEDS, brightness=BRIGHTNESS, auto_write=False)
+
+
+# Set up the LED strip and the compositor that draws onto it
+pixels = create_pixels()
+compositor = Compositor(NUM_LEDS)
+shown_frame = [None] * NUM_LEDS  # Colors last sent to the strip
 
 # ----------------------------
 # Utility Functions
@@ -57,7 +106,7 @@ def format_schedule(schedule):
     return json.dumps(schedule, indent=4) if isinstance(schedule, dict) else str(schedule)
 
 
-def turn_off_leds(show_log):
+def turn_off_leds(show_log=True):
     """
     Turn off all LEDs by setting their color to off.
     """
@@ -66,6 +115,7 @@ def turn_off_leds(show_log):
 
     pixels.fill(COLOR_OFF)
     pixels.show()
+    shown_frame[:] = [COLOR_OFF] * NUM_LEDS
 
 
 # Ensure LEDs are turned off when the program exits
@@ -81,8 +131,13 @@ class AnimationManager:
     """
     def __init__(self):
         self.lock = Lock()
+        self.rendered = Condition(self.lock)
         self.current_animation = ''
         self.params = {}
+        self.generation = 0  # Incremented on every set_animation call
+        self.rendered_generation = 0  # Last generation drawn by run_animations
+        self.rendered_at = None  # time.monotonic() of the last render
+        self.rendered_animation = ''  # Name of the animation run_animations is drawing
 
     def set_animation(self, name, params=None):
         """
@@ -96,6 +151,7 @@ class AnimationManager:
         with self.lock:
             self.current_animation = name
             self.params = params if params else {}
+            self.generation += 1
 
     def get_animation(self):
         """
@@ -107,167 +163,384 @@ class AnimationManager:
         with self.lock:
             return self.current_animation, self.params
 
+    def clear_animation(self, name, params):
+        """
+        Turn off an animation that failed, unless another has been set since.
+
+        Args:
+            name (str): Name of the failed animation.
+            params (dict): Parameters of the failed animation.
+
+        Returns:
+            bool: True if the animation was cleared.
+        """
+        with self.lock:
+            if self.current_animation != name or self.params != params:
+                return False
+            logger.info(f'CURRENT_ANIMATION: cleared after {name} failed')
+            self.current_animation = ''
+            self.params = {}
+            return True
+
+    def set_overlay(self, name, segment="all", blend="add", opacity=1.0, **kwargs):
+        """
+        Draw an overlay above the current animation until it is cleared.
+
+        Args:
+            name (str): Name of the overlay in OVERLAYS.
+            segment (str): Segment of the strip to draw on.
+            blend (str): Blend mode used to combine it with the animation.
+            opacity (float): Strength of the overlay (0.0 to 1.0).
+            kwargs: Parameters for the overlay generator.
+        """
+        logger.info(f'OVERLAY: {name} on {segment} ({blend})')
+        compositor.set_layer(f"overlay:{name}", OVERLAYS[name](**kwargs), SEGMENTS[segment], blend, opacity, z=1)
+
+    def clear_overlay(self, name):
+        """
+        Remove an overlay.
+
+        Args:
+            name (str): Name of the overlay.
+        """
+        logger.info(f'OVERLAY CLEARED: {name}')
+        compositor.remove_layer(f"overlay:{name}")
+
+    def get_overlays(self):
+        """
+        Get the names of the active overlays.
+
+        Returns:
+            list: Overlay names.
+        """
+        prefix = "overlay:"
+        return [name[len(prefix):] for name in compositor.layer_names() if name.startswith(prefix)]
+
+    def mark_rendered(self, name, params):
+        """
+        Record that run_animations has started drawing an animation.
+
+        Args:
+            name (str): Name of the animation being drawn.
+            params (dict): Parameters of the animation being drawn.
+        """
+        with self.rendered:
+            self.rendered_animation = name
+            if name == self.current_animation and params is self.params:
+                self.rendered_generation = self.generation
+                self.rendered_at = time.monotonic()
+                self.rendered.notify_all()
+
+    def wait_for_render(self, timeout=None):
+        """
+        Wait until the animation set most recently has been drawn.
+
+        Args:
+            timeout (float): Maximum number of seconds to wait.
+
+        Returns:
+            float: time.monotonic() of the render, or None on timeout.
+        """
+        with self.rendered:
+            target = self.generation
+            if self.rendered.wait_for(lambda: self.rendered_generation >= target, timeout):
+                return self.rendered_at
+            return None
+
 
 # Initialize animation manager
 animation_manager = AnimationManager()
 
 # ----------------------------
-# Animation Functions
+# Animation Generators
 # ----------------------------
 
-def pulsate_white(show_log, steps=50, interval=0.05):
+def ticks(seconds):
     """
-    Make the LEDs pulsate white with a smooth breathing effect.
+    Convert a duration to a number of compositor ticks (at least one).
     """
-    if show_log:
-        logger.info("Starting pulsating white effect.")
-    try:
-        while True:
-            current, params = animation_manager.get_animation()
-            if current != 'pulsate_white':
-                return
+    return max(1, round(seconds / FRAME_INTERVAL))
 
-            # Fade in and fade out
-            for step in range(steps + 1):
-                brightness = 0.2 + 0.8 * math.sin((math.pi / 2) * (step / steps))
-                white = (int(255 * brightness),) * 3
-                pixels.fill(white)
-                pixels.show()
-                time.sleep(interval)
-
-            for step in range(steps, -1, -1):
-                brightness = 0.2 + 0.8 * math.sin((math.pi / 2) * (step / steps))
-                white = (int(255 * brightness),) * 3
-                pixels.fill(white)
-                pixels.show()
-                time.sleep(interval)
-    except Exception as e:
-        logger.error(f"Pulsating white effect failed: {e}")
+
+def mix(start, end, ratio):
+    """
+    Interpolate between two colors.
+    """
+    return tuple(int(s * (1 - ratio) + e * ratio) for s, e in zip(start, end))
 
 
-def blink_red_and_turn_off(show_log, blink_count=5, blink_interval=0.5):
+def hold(color, count):
     """
-    Make all LEDs blink red a specified number of times and then turn them off.
+    Yield a color for a number of ticks.
     """
-    if show_log:
-        logger.info(f"Blinking all LEDs red {blink_count} times, then turning them off.")
+    for _ in range(count):
+        yield color
+
+
+def timed(values, interval):
+    """
+    Yield each value for interval seconds, carrying the rounding over to the next value.
+
+    Intervals that aren't a whole number of ticks alternate between the nearest
+    tick counts (50 ms is 2 or 3 ticks), so the sequence keeps its total duration.
+    """
+    shown = 0
+    for step, value in enumerate(values, 1):
+        count = round(step * interval / FRAME_INTERVAL) - shown
+        shown += count
+        yield from hold(value, count)
+
+
+def fade(start, end, steps, interval):
+    """
+    Yield a fade between two colors in steps + 1 steps, each shown for interval seconds.
+    """
+    yield from timed((mix(start, end, step / steps) for step in range(steps + 1)), interval)
+
+
+def pulse(color, steps=50, interval=0.05):
+    """
+    Breathe a color between 20% and full brightness, forever.
+    """
+    levels = [
+        tuple(int(c * (0.2 + 0.8 * math.sin((math.pi / 2) * (step / steps)))) for c in color)
+        for step in range(steps + 1)
+    ]
+    while True:
+        yield from timed(levels + levels[::-1], interval)
 
-    for _ in range(blink_count):
-        current, params = animation_manager.get_animation()
-        if current != 'blink_red_and_turn_off':
-            return
 
-        pixels.fill(COLOR_RED)
-        pixels.show()
-        time.sleep(blink_interval)
+def blink(color, blink_count, blink_interval, on_finish=None):
+    """
+    Blink a color a number of times, then call on_finish.
+    """
+    yield from timed([color, COLOR_OFF] * blink_count, blink_interval)
+    if on_finish:
+        on_finish()
 
-        pixels.fill(COLOR_OFF)
-        pixels.show()
-        time.sleep(blink_interval)
 
-    animation_manager.set_animation('')
+def fade_segment(base_color, color, position, count, steps, interval, hold_time):
+    """
+    Fade one segment from the base color to its color and back, forever.
+
+    Segments fade in one after another by position, all hold, then all fade
+    back together, so count segments with the same timing stay in step.
+    """
+    fade_ticks = ticks((steps + 1) * interval)
+    while True:
+        yield from hold(base_color, ticks(1) + position * fade_ticks)
+        yield from fade(base_color, color, steps, interval)
+        yield from hold(color, (count - 1 - position) * fade_ticks + ticks(hold_time))
+        yield from fade(color, base_color, steps, interval)
 
 
-def set_leds(show_log, garbage_on, organics_on, recycling_on):
+def heartbeat(color=COLOR_WHITE, period=2.0):
     """
-    Set LED colors based on collection status for groups of 8 LEDs.
+    Two quick flashes every period seconds, for use as an overlay.
     """
+    flash = ticks(0.1)
+    while True:
+        yield from hold(color, flash)
+        yield from hold(None, flash)
+        yield from hold(color, flash)
+        yield from hold(None, max(1, ticks(period) - 3 * flash))
+
+# ----------------------------
+# Animations
+# ----------------------------
+
+def turn_off_animation(params, show_log):
     if show_log:
-        logger.info(f"Setting LEDs: Garbage={garbage_on}, Organics={organics_on}, Recycling={recycling_on}")
+        logger.info("Turning off LEDs.")
+    return {"all": COLOR_OFF}
+
+
+def pulsate_white(params, show_log):
+    """
+    Make the LEDs pulsate white with a smooth breathing effect.
+    """
+    if show_log:
+        logger.info("Starting pulsating white effect.")
+    return {"all": pulse(COLOR_WHITE)}
 
-    garbage_color = COLOR_GARBAGE if garbage_on else COLOR_WHITE
-    organics_color = COLOR_ORGANIC if organics_on else COLOR_WHITE
-    recycling_color = COLOR_RECYCLING if recycling_on else COLOR_WHITE
 
-    for i in range(8):
-        pixels[i] = garbage_color
-        pixels[i + 8] = organics_color
-        pixels[i + 16] = recycling_color
-        pixels[i + 24] = recycling_color
-        pixels[i + 32] = organics_color
-        pixels[i + 40] = garbage_color
+def blink_red_and_turn_off(params, show_log, blink_count=5, blink_interval=0.5):
+    """
+    Make all LEDs blink red a specified number of times and then turn them off.
+    """
+    if show_log:
+        logger.info(f"Blinking all LEDs red {blink_count} times, then turning them off.")
+    return {"all": blink(COLOR_RED, blink_count, blink_interval, lambda: animation_manager.set_animation(''))}
 
-    pixels.show()
 
+def set_leds(params, show_log):
+    """
+    Set LED colors based on collection status for each segment.
 
-def set_holiday_lights(show_log):
+    Segments listed in collection_state["pulse"] pulse their color instead of
+    staying solid.
+    """
+    collection_state = params.get(
+        'collection_state',
+        {"garbage_on": False, "organics_on": False, "recycling_on": False},
+    )
+    garbage_on = collection_state["garbage_on"]
+    organics_on = collection_state["organics_on"]
+    recycling_on = collection_state["recycling_on"]
+    if show_log:
+        logger.info(f"Setting LEDs: Garbage={garbage_on}, Organics={organics_on}, Recycling={recycling_on}")
+
+    colors = {
+        "garbage": COLOR_GARBAGE if garbage_on else COLOR_WHITE,
+        "organics": COLOR_ORGANIC if organics_on else COLOR_WHITE,
+        "recycling": COLOR_RECYCLING if recycling_on else COLOR_WHITE,
+    }
+    pulsing = collection_state.get("pulse", [])
+    return {segment: pulse(color) if segment in pulsing else color for segment, color in colors.items()}
+
+
+def set_holiday_lights(params, show_log):
     """
     Set all LEDs to solid red for a holiday.
     """
     if show_log:
         logger.info("Setting LEDs to solid red for holiday.")
-    pixels.fill(COLOR_HOLIDAY)
-    pixels.show()
+    return {"all": COLOR_HOLIDAY}
 
 
-def fade_to_color(show_log, collections, BASE_COLOR, steps=100, interval=0.02, hold_time=5):
+def fade_to_color(params, show_log, hold_time=5):
     """
-    Fade LEDs between base color and collection colors.
+    Fade each segment between the base color and its collection color.
 
     Args:
-        collections (list): Types of collections (e.g., garbage, recycling).
-        BASE_COLOR (tuple): RGB color to fade to.
-        steps (int): Number of steps for fading. Default is 100.
-        interval (float): Time between each step. Default is 0.02 seconds.
+        params (dict): fade_state with collections (e.g., garbage, recycling), base_color,
+                       steps (number of steps for fading) and interval (time between steps).
         hold_time (int): Duration to hold the collection colors. Default is 5 seconds.
     """
+    fade_state = params.get(
+        'fade_state',
+        {
+            "collections": [],
+            "base_color": COLOR_WHITE,
+            "steps": 100,
+            "interval": 0.02,
+        }
+    )
+    collections = fade_state["collections"]
+    base_color = tuple(fade_state["base_color"])
+    if show_log:
+        logger.info(f"Starting at {base_color}, fading LEDs to collection colors, holding, and cycling back.")
+
+    colors = {
+        "garbage": COLOR_GARBAGE if "garbage" in collections else COLOR_NO,
+        "organics": COLOR_ORGANIC if "organics" in collections else COLOR_NO,
+        "recycling": COLOR_RECYCLING if "recycling" in collections else COLOR_NO,
+    }
+    return {
+        segment: fade_segment(base_color, color, position, len(colors),
+                              fade_state["steps"], fade_state["interval"], hold_time)
+        for position, (segment, color) in enumerate(colors.items())
+    }
+
+
+# Animation name -> function returning {segment: color or generator}
+ANIMATIONS = {
+    '': turn_off_animation,
+    'pulsate_white': pulsate_white,
+    'blink_red_and_turn_off': blink_red_and_turn_off,
+    'set_leds': set_leds,
+    'set_holiday_lights': set_holiday_lights,
+    'fade_to_color': fade_to_color,
+}
+
+# Animations understood by run_animations ('' turns the LEDs off)
+ANIMATION_NAMES = tuple(ANIMATIONS)
+
+# Overlay name -> generator function, drawn above the current animation
+OVERLAYS = {
+    'heartbeat': heartbeat,
+}
+
+
+def is_color(value):
+    """
+    Check that a value is an RGB color with channels from 0 to 255.
+    """
+    return (
+        isinstance(value, (list, tuple)) and len(value) == 3
+        and all(isinstance(c, int) and not isinstance(c, bool) and 0 <= c <= 255 for c in value)
+    )
+
+
+def check_animation(name, params):
+    """
+    Check that an animation can be built from the given parameters before it is shown.
+
+    The animation is built once and each generator advanced by one tick, so
+    errors surface here instead of in the animation thread.
+
+    Args:
+        name (str): Name of the animation.
+        params (dict): Parameters for the animation.
+
+    Raises:
+        ValueError: If the name is unknown or the parameters are missing or invalid.
+    """
+    if name not in ANIMATIONS:
+        raise ValueError(f"Unknown animation: {name}")
+    if not isinstance(params, dict):
+        raise ValueError("params must be an object")
+
+    if name == 'set_leds' and 'collection_state' in params:
+        collection_state = params['collection_state']
+        if not isinstance(collection_state, dict) or not all(
+            key in collection_state for key in ("garbage_on", "organics_on", "recycling_on")
+        ):
+            raise ValueError("collection_state needs garbage_on, organics_on and recycling_on")
+        if not isinstance(collection_state.get("pulse", []), list):
+            raise ValueError("collection_state.pulse must be a list of segments")
+
+    if name == 'fade_to_color' and 'fade_state' in params:
+        fade_state = params['fade_state']
+        if not isinstance(fade_state, dict) or not all(
+            key in fade_state for key in ("collections", "base_color", "steps", "interval")
+        ):
+            raise ValueError("fade_state needs collections, base_color, steps and interval")
+        if not isinstance(fade_state["collections"], list):
+            raise ValueError("fade_state.collections must be a list")
+        if not is_color(fade_state["base_color"]):
+            raise ValueError("fade_state.base_color must be three values from 0 to 255")
+        steps, interval = fade_state["steps"], fade_state["interval"]
+        if not isinstance(steps, int) or isinstance(steps, bool) or not 1 <= steps <= MAX_FADE_STEPS:
+            raise ValueError(f"fade_state.steps must be an integer from 1 to {MAX_FADE_STEPS}")
+        if not isinstance(interval, (int, float)) or isinstance(interval, bool) \
+                or not FRAME_INTERVAL <= interval <= MAX_FADE_INTERVAL:
+            raise ValueError(f"fade_state.interval must be from {FRAME_INTERVAL} to {MAX_FADE_INTERVAL} seconds")
+
     try:
-        while True:
-            current, params = animation_manager.get_animation()
-            if current != 'fade_to_color':
-                return
-            if not params or "fade_state" not in params:
-                return
-            if show_log:
-                logger.info(f"Starting at {BASE_COLOR}, fading LEDs to collection colors, holding, and cycling back.")
-            garbage_color = COLOR_GARBAGE if "garbage" in collections else COLOR_NO
-            organics_color = COLOR_ORGANIC if "organics" in collections else COLOR_NO
-            recycling_color = COLOR_RECYCLING if "recycling" in collections else COLOR_NO
-
-            paired_groups = [
-                {"groups": [0, 40], "color": garbage_color},
-                {"groups": [8, 32], "color": organics_color},
-                {"groups": [16, 24], "color": recycling_color},
-            ]
-
-            pixels.fill(BASE_COLOR)
-            pixels.show()
-            time.sleep(1)
-
-            for pair in paired_groups:
-                for step in range(steps + 1):
-                    fade_in_ratio = step / steps
-                    fade_out_ratio = 1 - fade_in_ratio
-
-                    for group_start in pair["groups"]:
-                        for j in range(group_start, group_start + 8):
-                            r = int(BASE_COLOR[0] * fade_out_ratio + pair["color"][0] * fade_in_ratio)
-                            g = int(BASE_COLOR[1] * fade_out_ratio + pair["color"][1] * fade_in_ratio)
-                            b = int(BASE_COLOR[2] * fade_out_ratio + pair["color"][2] * fade_in_ratio)
-                            pixels[j] = (r, g, b)
-
-                    pixels.show()
-                    time.sleep(interval)
-
-            time.sleep(hold_time)
-
-            for step in range(steps + 1):
-                fade_in_ratio = step / steps
-                fade_out_ratio = 1 - fade_in_ratio
-
-                for pair in paired_groups:
-                    for group_start in pair["groups"]:
-                        for j in range(group_start, group_start + 8):
-                            r = int(pair["color"][0] * fade_out_ratio + BASE_COLOR[0] * fade_in_ratio)
-                            g = int(pair["color"][1] * fade_out_ratio + BASE_COLOR[1] * fade_in_ratio)
-                            b = int(pair["color"][2] * fade_out_ratio + BASE_COLOR[2] * fade_in_ratio)
-                            pixels[j] = (r, g, b)
-
-                pixels.show()
-                time.sleep(interval)
-    except KeyboardInterrupt:
-        logger.info("Fade to color interrupted. Turning off LEDs.")
-        animation_manager.set_animation('')
+        segments = ANIMATIONS[name](params, False)
+        for source in segments.values():
+            if not isinstance(source, tuple):
+                next(source)
+    except Exception as e:
+        raise ValueError(f"Cannot build {name}: {e}") from e
+
+
+def apply_animation(name, params, show_log=False):
+    """
+    Replace the animation layers in the compositor.
+
+    Unknown animation names turn the LEDs off.
+
+    Args:
+        name (str): Name of the animation.
+        params (dict): Parameters for the animation.
+        show_log (bool): Whether to log the animation starting.
+    """
+    segments = ANIMATIONS.get(name, turn_off_animation)(params, show_log)
+    compositor.clear_layers("animation:")
+    for segment, source in segments.items():
+        compositor.set_layer(f"animation:{segment}", source, SEGMENTS[segment])
 
 # ----------------------------
 # Schedule Functions
@@ -374,69 +647,85 @@ def update_leds_today():
 # Main Animation Loop
 # ----------------------------
 
+def draw_frame():
+    """
+    Render one compositor tick and send it to the LEDs if anything changed.
+
+    Returns:
+        bool: True if a new frame was shown.
+    """
+    frame = compositor.render()
+    if frame is None:
+        return False
+
+    for index, color in enumerate(frame):
+        if color != shown_frame[index]:
+            pixels[index] = color
+            shown_frame[index] = color
+    pixels.show()
+    return True
+
+
 def run_animations():
     """
-    Main loop to manage animations, only updating LEDs if the animation changes.
+    Main loop: render one frame per tick, rebuilding the animation layers only when the animation changes.
+
+    If building or drawing a frame fails, the error is logged, every layer
+    (overlays included) is removed, the LEDs are turned off and the failed
+    animation is cleared, and the loop carries on with the next tick.
     """
+    last_generation = None  # Track the last set_animation call seen
     last_animation = None  # Track last animation state
     last_params = None  # Track last animation parameters
+    next_tick = time.monotonic()
 
     while True:
-        name, params = animation_manager.get_animation()
-        show_log = False
-
-        if name != last_animation or params != last_params:
-            show_log = True
-            last_animation = name
-            last_params = params  # Update last params to prevent duplicate runs
-
-            if name == 'pulsate_white':
-                pulsate_white(show_log)
-            elif name == 'blink_red_and_turn_off':
-                blink_red_and_turn_off(show_log)
-            elif name == 'set_leds':
-                collection_state = params.get(
-                    'collection_state',
-                    {"garbage_on": False, "organics_on": False, "recycling_on": False},
-                )
-                set_leds(
-                    show_log,
-                    collection_state["garbage_on"],
-                    collection_state["organics_on"],
-                    collection_state["recycling_on"],
-                )
-            elif name == "set_holiday_lights":
-                set_holiday_lights(show_log)
-            elif name == "fade_to_color":
-                fade_state = params.get(
-                    'fade_state',
-                    {
-                        "collections": [],
-                        "base_color": (255, 255, 255),
-                        "steps": 100,
-                        "interval": 0.02,
-                    }
-                )
-                fade_to_color(
-                    show_log,
-                    fade_state["collections"],
-                    fade_state["base_color"],
-                    fade_state["steps"],
-                    fade_state["interval"]
-                )
+        try:
+            if animation_manager.generation != last_generation:
+                last_generation = animation_manager.generation
+                name, params = animation_manager.get_animation()
+
+                if name != last_animation or params != last_params:
+                    last_animation = name
+                    last_params = params  # Update last params to prevent duplicate runs
+                    apply_animation(name, params, show_log=True)
+
+                draw_frame()
+                animation_manager.mark_rendered(name, params)
             else:
-                turn_off_leds(show_log)
-
-        time.sleep(0.1)  # Prevent CPU overuse
+                draw_frame()
+        except Exception as e:
+            logger.error(f"Animation '{last_animation}' failed: {e}. Turning off LEDs.")
+            failed_animation, failed_params = last_animation, last_params
+            last_animation, last_params = '', None
+            try:
+                compositor.clear_layers()
+                apply_animation('', None)
+                draw_frame()
+                animation_manager.clear_animation(failed_animation, failed_params)
+                animation_manager.mark_rendered('', None)
+            except Exception as e:
+                logger.error(f"Failed to turn off LEDs: {e}")
+
+        # Keep a steady frame rate, skipping ahead if a frame overran
+        next_tick += FRAME_INTERVAL
+        delay = next_tick - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        else:
+            next_tick = time.monotonic()
 
 # ----------------------------
 # Threads and Startup
 # ----------------------------
 
-# Start animation thread
-animation_thread = Thread(target=run_animations, daemon=True)
-animation_thread.start()
+def start_animation_thread():
+    """
+    Start the main animation loop in a background thread.
 
-# Start update LEDs thread
-update_leds_today_thread = Thread(target=update_leds_today, daemon=True)
-update_leds_today_thread.start()
+    Returns:
+        Thread: The running animation thread.
+    """
+    animation_thread = Thread(target=run_animations, name=ANIMATION_THREAD_NAME, daemon=True)
+    animation_thread.start()
+    return animation_thread
@@ -0,0 +1,262 @@
+# ----------------------------
+# Imports
+# ----------------------------
+
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from src.led_configuration import ANIMATION_THREAD_NAME, animation_manager
+
+load_dotenv()
+
+# ----------------------------
+# Configuration and Constants
+# ----------------------------
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+PROFILE_DIR = Path(os.getenv("profile_dir", "profiles"))  # Where collapsed-stack files are written
+PROFILE_WINDOW = float(os.getenv("profile_window", "30"))  # Default seconds to sample for
+PROFILE_INTERVAL = 0.01  # Seconds between samples
+
+# ----------------------------
+# Thread Stack Dump
+# ----------------------------
+
+def dump_thread_stacks():
+    """
+    Format the current stack of every running thread.
+
+    Returns:
+        str: One block per thread, headed by its name and id.
+    """
+    frames = sys._current_frames()
+    blocks = []
+    for thread in threading.enumerate():
+        frame = frames.get(thread.ident)
+        if frame is None:
+            continue
+        stack = "".join(traceback.format_stack(frame))
+        blocks.append(f'Thread "{thread.name}" (id {thread.ident}, daemon={thread.daemon}):\n{stack}')
+    return "\n".join(blocks)
+
+# ----------------------------
+# Sampling Profiler
+# ----------------------------
+
+def get_thread_cpu_time(thread):
+    """
+    Get the CPU time a thread has used.
+
+    Args:
+        thread (Thread): The thread to check.
+
+    Returns:
+        float: CPU seconds used by the thread, or None if the platform can't tell.
+    """
+    try:
+        return time.clock_gettime(time.pthread_getcpuclockid(thread.ident))
+    except (AttributeError, OSError, TypeError):
+        return None
+
+
+def frame_label(name):
+    """
+    Make a name safe for a collapsed-stack line, where ';' separates frames
+    and a space separates the stack from its count.
+    """
+    return name.replace(";", "_").replace(" ", "_")
+
+
+@lru_cache(maxsize=None)
+def module_name(filename):
+    """
+    Get the short module name shown for a source file in collapsed stacks.
+    """
+    return frame_label(Path(filename).stem)
+
+
+def collapse_stack(frame):
+    """
+    List a stack's calls as module:function, outermost first.
+
+    Walks the frames directly rather than through traceback, which would look
+    up the source line of every frame on every sample.
+
+    Args:
+        frame (frame): The innermost frame of the stack.
+
+    Returns:
+        list: One "module:function" entry per frame.
+    """
+    calls = []
+    while frame is not None:
+        code = frame.f_code
+        calls.append(f"{module_name(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    calls.reverse()
+    return calls
+
+
+class SamplingProfiler:
+    """
+    Samples every thread's stack at a fixed interval for a set window.
+
+    Nothing runs until start() is called; the sampler thread exits when the
+    window ends or stop() is called.
+    """
+    def __init__(self, output_dir=PROFILE_DIR, interval=PROFILE_INTERVAL):
+        self.output_dir = Path(output_dir)
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.last_result = None
+
+    def is_running(self):
+        with self.lock:
+            return self.thread is not None and self.thread.is_alive()
+
+    def start(self, duration=PROFILE_WINDOW):
+        """
+        Start sampling in a background thread.
+
+        Args:
+            duration (float): Seconds to sample for.
+
+        Returns:
+            bool: True if sampling started, False if it was already running.
+        """
+        with self.lock:
+            if self.thread is not None and self.thread.is_alive():
+                return False
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self.run, args=(duration,), name="profiler", daemon=True)
+            self.thread.start()
+        logger.info(f"Sampling profiler started for {duration:.0f} seconds.")
+        return True
+
+    def stop(self):
+        """
+        Stop sampling early. The collected samples are still written out.
+        """
+        self.stop_event.set()
+
+    def toggle(self, duration=PROFILE_WINDOW):
+        """
+        Start the profiler, or stop it if it is already running.
+        """
+        if not self.start(duration):
+            logger.info("Stopping sampling profiler early.")
+            self.stop()
+
+    def run(self, duration):
+        stacks = Counter()
+        animation_samples = Counter()
+        animation_cpu = Counter()
+        animation_wall = Counter()
+        started = last_sample = time.monotonic()
+        own_ident = threading.get_ident()
+
+        animation_thread = next((t for t in threading.enumerate() if t.name == ANIMATION_THREAD_NAME), None)
+        last_cpu = get_thread_cpu_time(animation_thread) if animation_thread else None
+
+        while not self.stop_event.wait(self.interval) and time.monotonic() - started < duration:
+            frames = sys._current_frames()
+            names = {t.ident: t.name for t in threading.enumerate()}
+            animation = animation_manager.rendered_animation or "off"
+
+            for ident, frame in frames.items():
+                if ident == own_ident:
+                    continue
+                calls = collapse_stack(frame)
+                thread_name = names.get(ident, str(ident))
+                if thread_name == ANIMATION_THREAD_NAME:
+                    thread_name = f"{thread_name}[{animation}]"
+                stacks[";".join([frame_label(thread_name)] + calls)] += 1
+
+            # Attribute the animation thread's CPU time and the wall time since the
+            # last sample to the current animation. CPU time is read first so it
+            # never covers more than the wall time it is divided by.
+            if last_cpu is not None:
+                cpu = get_thread_cpu_time(animation_thread)
+                if cpu is not None:
+                    animation_cpu[animation] += cpu - last_cpu
+                    last_cpu = cpu
+            now = time.monotonic()
+            animation_samples[animation] += 1
+            animation_wall[animation] += now - last_sample
+            last_sample = now
+
+        elapsed = time.monotonic() - started
+        self.last_result = self.write_results(stacks, animation_samples, animation_cpu, animation_wall, elapsed)
+
+    def write_results(self, stacks, animation_samples, animation_cpu, animation_wall, elapsed):
+        """
+        Write collapsed stacks for flamegraph tools and log the per-animation CPU breakdown.
+
+        CPU use is given as a share of the wall time each animation was on
+        screen, measured between samples rather than assumed from the interval.
+
+        Returns:
+            dict: Output path, window length and the per-animation breakdown.
+        """
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        path = self.output_dir / f"profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.folded"
+        with open(path, "w") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+        breakdown = {
+            animation: {
+                "samples": samples,
+                "wall_seconds": round(animation_wall[animation], 3),
+                "cpu_seconds": round(animation_cpu[animation], 4),
+                "cpu_percent": round(100 * animation_cpu[animation] / animation_wall[animation], 1)
+                if animation_wall[animation] else 0.0,
+            }
+            for animation, samples in animation_samples.most_common()
+        }
+
+        logger.info(f"Profile written to {path} ({elapsed:.1f} seconds, {sum(stacks.values())} stack samples)")
+        for animation, stats in breakdown.items():
+            logger.info(f"  Animation '{animation}': {stats['cpu_seconds']:.3f} s CPU "
+                        f"({stats['cpu_percent']:.1f}% of {stats['wall_seconds']:.1f} s shown)")
+
+        return {"path": str(path), "seconds": round(elapsed, 1), "animations": breakdown}
+
+
+# Initialize profiler (idle until started)
+profiler = SamplingProfiler()
+
+# ----------------------------
+# Signal Handlers
+# ----------------------------
+
+def install_signal_handlers():
+    """
+    Install debugging signal handlers. Must be called from the main thread.
+
+    SIGUSR1 logs every thread's stack.
+    SIGUSR2 starts the sampling profiler, or stops it early if it is running.
+    """
+    if not hasattr(signal, "SIGUSR1"):
+        logger.info("Debug signals not supported on this platform.")
+        return
+
+    signal.signal(signal.SIGUSR1, lambda signum, frame: logger.info(f"Thread stacks:\n{dump_thread_stacks()}"))
+    signal.signal(signal.SIGUSR2, lambda signum, frame: profiler.toggle())
+    logger.info(f"Debug signals installed: kill -USR1 {os.getpid()} dumps stacks, "
+                f"kill -USR2 {os.getpid()} toggles the profiler.")
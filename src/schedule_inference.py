@@ -0,0 +1,420 @@
+"""
+Infer recurrence rules from recorded collection history and predict future schedules.
+
+Collections happen on one weekday, each type every N weeks, and a holiday
+earlier in the week pushes that week's collections back by a day or so. The
+rules capture exactly that, so the schedule can be extrapolated months ahead
+and scraping is only needed now and then to validate them.
+
+Usage:
+    python -m src.schedule_inference [history.json] [--holdout-weeks N]
+"""
+
+# ----------------------------
+# Imports
+# ----------------------------
+
+import argparse
+import json
+import logging
+from collections import Counter
+from datetime import date, datetime, timedelta
+
+# ----------------------------
+# Configuration and Constants
+# ----------------------------
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+MAX_INTERVAL_WEEKS = 4  # Longest recurrence considered (every 4 weeks)
+MIN_CONFIDENCE = 0.9  # Minimum confidence for every type before predictions are trusted
+MIN_ACCURACY = 0.98  # Minimum validated accuracy before predictions are trusted
+MIN_HISTORY_WEEKS = 8  # Minimum span of recorded history before predictions are trusted
+RULES_MAX_AGE_DAYS = 28  # Re-scrape to validate the rules at least this often
+PREDICT_WEEKS = 12  # How far ahead to extend the schedule
+
+
+def nth_weekday(year, month, weekday, n):
+    """
+    Get the nth weekday of a month (n=-1 for the last one).
+    """
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year, month + 1, 1) - timedelta(days=1) if month < 12 else date(year, 12, 31)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+# Holidays a hauler may observe, by name
+HOLIDAY_RULES = {
+    "new_years_day": lambda year: date(year, 1, 1),
+    "mlk_day": lambda year: nth_weekday(year, 1, 0, 3),
+    "presidents_day": lambda year: nth_weekday(year, 2, 0, 3),
+    "memorial_day": lambda year: nth_weekday(year, 5, 0, -1),
+    "juneteenth": lambda year: date(year, 6, 19),
+    "independence_day": lambda year: date(year, 7, 4),
+    "labor_day": lambda year: nth_weekday(year, 9, 0, 1),
+    "thanksgiving_day": lambda year: nth_weekday(year, 11, 3, 4),
+    "christmas_day": lambda year: date(year, 12, 25),
+}
+
+# Assumed observed unless recorded history shows otherwise
+DEFAULT_HOLIDAYS = (
+    "new_years_day",
+    "memorial_day",
+    "independence_day",
+    "labor_day",
+    "thanksgiving_day",
+    "christmas_day",
+)
+
+# ----------------------------
+# Utility Functions
+# ----------------------------
+
+def week_start(day):
+    """
+    Get the Monday of the week containing a date.
+    """
+    return day - timedelta(days=day.weekday())
+
+
+def flatten_schedule(schedule):
+    """
+    Flatten a weekly schedule into collections by date.
+
+    Args:
+        schedule (dict): Weeks keyed by their first date, each a list of daily schedules.
+
+    Returns:
+        dict: Collections keyed by date string.
+    """
+    return {
+        daily_schedule["date"]: list(daily_schedule.get("collections", []))
+        for daily_schedules in schedule.values()
+        for daily_schedule in daily_schedules
+    }
+
+
+def group_by_week(days, predicted=()):
+    """
+    Group collections by date into Monday-started weeks in the saved schedule format.
+
+    Args:
+        days (dict): Collections keyed by date string.
+        predicted (set): Date strings to mark as predicted rather than scraped.
+
+    Returns:
+        dict: Weeks keyed by their Monday, each a list of daily schedules.
+    """
+    weeks = {}
+    for date_str in sorted(days):
+        monday = week_start(date.fromisoformat(date_str)).isoformat()
+        daily_schedule = {"date": date_str, "collections": days[date_str]}
+        if date_str in predicted:
+            daily_schedule["predicted"] = True
+        weeks.setdefault(monday, []).append(daily_schedule)
+    return weeks
+
+
+def get_holiday_dates(names, first_year, last_year):
+    """
+    Get the dates of the named holidays across a range of years.
+    """
+    return {
+        HOLIDAY_RULES[name](year)
+        for name in names
+        for year in range(first_year, last_year + 1)
+    }
+
+# ----------------------------
+# Rule Inference
+# ----------------------------
+
+def infer_rules(history):
+    """
+    Infer recurrence rules from recorded collection history.
+
+    Args:
+        history (dict): Collections keyed by date string, as recorded from scrapes.
+
+    Returns:
+        dict: The inferred rules, or None if the history has no collections.
+    """
+    days = {date.fromisoformat(d): collections for d, collections in history.items()}
+    if not days:
+        return None
+
+    holidays = {d for d, collections in days.items() if "holiday" in collections}
+    collection_days = {d: [c for c in collections if c != "holiday"] for d, collections in days.items()}
+    collection_days = {d: collections for d, collections in collection_days.items() if collections}
+    if not collection_days:
+        return None
+
+    # Collection weekday, judged from weeks without a holiday
+    holiday_weeks = {week_start(h) for h in holidays}
+    usual_days = [d for d in collection_days if week_start(d) not in holiday_weeks] or list(collection_days)
+    weekday = Counter(d.weekday() for d in usual_days).most_common(1)[0][0]
+
+    # How far a holiday on or before the collection day pushes it back
+    shifts = Counter()
+    for h in holidays:
+        if h.weekday() <= weekday:
+            for d in collection_days:
+                if week_start(d) == week_start(h):
+                    shifts[d.weekday() - weekday] += 1
+    holiday_shift = shifts.most_common(1)[0][0] if shifts else 1
+
+    # Each type's interval in weeks and which weeks it falls on, counting only
+    # weeks whose collection day lies inside the recorded range
+    first_week = week_start(min(days))
+    total_weeks = (week_start(max(days)) - first_week).days // 7 + 1
+    recorded_weeks = [
+        w for w in range(total_weeks)
+        if min(days) <= first_week + timedelta(weeks=w, days=weekday) <= max(days)
+    ]
+    types = {}
+    for collections in collection_days.values():
+        for collection_type in collections:
+            types.setdefault(collection_type, None)
+
+    for collection_type in types:
+        weeks = {(week_start(d) - first_week).days // 7 for d, c in collection_days.items() if collection_type in c}
+        best = None
+        for interval in range(1, MAX_INTERVAL_WEEKS + 1):
+            phase, in_phase = Counter(w % interval for w in weeks).most_common(1)[0]
+            expected = sum(1 for w in recorded_weeks if w % interval == phase) or 1
+            confidence = (in_phase / len(weeks)) * min(in_phase / expected, 1.0)
+            if best is None or confidence > best[2] + 1e-9:
+                best = (interval, phase, confidence)
+
+        interval, phase, confidence = best
+        types[collection_type] = {
+            "interval_weeks": interval,
+            "anchor_week": (first_week + timedelta(weeks=phase)).isoformat(),
+            "confidence": round(confidence, 3),
+        }
+
+    # Holidays kept or dropped by how often the recorded history observed them
+    observed_years = range(min(days).year, max(days).year + 1)
+    holiday_names = set(DEFAULT_HOLIDAYS)
+    for name, rule in HOLIDAY_RULES.items():
+        observed = sum(1 for year in observed_years if rule(year) in holidays)
+        ignored = sum(1 for year in observed_years if rule(year) in days and rule(year) not in holidays)
+        if observed > ignored:
+            holiday_names.add(name)
+        elif ignored > observed:
+            holiday_names.discard(name)
+    holiday_names = sorted(holiday_names)
+
+    return {
+        "weekday": weekday,
+        "holiday_shift_days": holiday_shift,
+        "holidays": holiday_names,
+        "holiday_dates": sorted(h.isoformat() for h in holidays),
+        "types": types,
+        "observed_from": min(days).isoformat(),
+        "observed_through": max(days).isoformat(),
+    }
+
+# ----------------------------
+# Prediction and Validation
+# ----------------------------
+
+def predict_days(rules, start, end):
+    """
+    Predict collections for every day in a date range.
+
+    Args:
+        rules (dict): Rules from infer_rules.
+        start (date): First day to predict.
+        end (date): Last day to predict.
+
+    Returns:
+        dict: Collections keyed by date string.
+    """
+    holidays = get_holiday_dates(rules["holidays"], start.year, end.year)
+    holidays |= {date.fromisoformat(h) for h in rules.get("holiday_dates", [])}
+
+    days = {(start + timedelta(days=i)).isoformat(): [] for i in range((end - start).days + 1)}
+    for h in holidays:
+        if h.isoformat() in days:
+            days[h.isoformat()].append("holiday")
+
+    monday = week_start(start)
+    while monday <= end:
+        shifted = any(week_start(h) == monday and h.weekday() <= rules["weekday"] for h in holidays)
+        day = monday + timedelta(days=rules["weekday"] + (rules["holiday_shift_days"] if shifted else 0))
+        if day.isoformat() in days:
+            for collection_type, rule in rules["types"].items():
+                weeks = (monday - date.fromisoformat(rule["anchor_week"])).days // 7
+                if weeks % rule["interval_weeks"] == 0:
+                    days[day.isoformat()].append(collection_type)
+        monday += timedelta(weeks=1)
+
+    return days
+
+
+def predict_schedule(rules, start, weeks=PREDICT_WEEKS):
+    """
+    Predict the schedule for the coming weeks in the saved schedule format.
+
+    Args:
+        rules (dict): Rules from infer_rules.
+        start (date): First day to predict.
+        weeks (int): Number of weeks to predict.
+
+    Returns:
+        dict: Weeks keyed by their Monday, each a list of daily schedules marked as predicted.
+    """
+    days = predict_days(rules, start, start + timedelta(weeks=weeks) - timedelta(days=1))
+    return group_by_week(days, predicted=set(days))
+
+
+def evaluate_rules(rules, history):
+    """
+    Compare the rules' predictions with recorded collections.
+
+    Args:
+        rules (dict): Rules from infer_rules.
+        history (dict): Recorded collections keyed by date string.
+
+    Returns:
+        dict: Days compared, days predicted correctly, accuracy and the mismatched days.
+    """
+    if not history:
+        return {"days": 0, "correct": 0, "accuracy": 0.0, "mismatches": []}
+
+    predicted = predict_days(rules, date.fromisoformat(min(history)), date.fromisoformat(max(history)))
+    mismatches = [
+        {"date": d, "expected": sorted(actual), "predicted": sorted(predicted[d])}
+        for d, actual in sorted(history.items())
+        if sorted(actual) != sorted(predicted[d])
+    ]
+    correct = len(history) - len(mismatches)
+    return {
+        "days": len(history),
+        "correct": correct,
+        "accuracy": correct / len(history),
+        "mismatches": mismatches,
+    }
+
+
+def split_history(history, holdout_weeks):
+    """
+    Split recorded history into days to infer rules from and later days to evaluate them on.
+
+    Args:
+        history (dict): Recorded collections keyed by date string.
+        holdout_weeks (int): Number of weeks at the end of the history to hold out.
+
+    Returns:
+        tuple: The training and evaluation histories.
+    """
+    cutoff = (date.fromisoformat(max(history)) - timedelta(weeks=holdout_weeks)).isoformat()
+    training = {d: c for d, c in history.items() if d <= cutoff}
+    evaluation = {d: c for d, c in history.items() if d > cutoff}
+    return training, evaluation
+
+
+def rules_are_trusted(rules):
+    """
+    Check whether the rules were accurate and confident when last validated.
+
+    Only rules inferred from at least MIN_HISTORY_WEEKS of history and
+    validated on days they were not inferred from can be trusted.
+
+    Args:
+        rules (dict): Saved rules, or None.
+
+    Returns:
+        bool: True if every type is confident, the history is long enough and the last validation was accurate.
+    """
+    if not rules or not rules.get("types") or "validated_at" not in rules:
+        return False
+    observed_days = date.fromisoformat(rules["observed_through"]) - date.fromisoformat(rules["observed_from"])
+    return (
+        observed_days >= timedelta(weeks=MIN_HISTORY_WEEKS)
+        and rules.get("accuracy", 0.0) >= MIN_ACCURACY
+        and all(rule["confidence"] >= MIN_CONFIDENCE for rule in rules["types"].values())
+    )
+
+
+def rules_are_current(rules, now=None):
+    """
+    Check whether the rules can be used in place of scraping.
+
+    Args:
+        rules (dict): Saved rules, or None.
+        now (datetime): Current time, defaults to now.
+
+    Returns:
+        bool: True if the rules are trusted and were validated recently.
+    """
+    if not rules_are_trusted(rules):
+        return False
+    now = now or datetime.now()
+    return now - datetime.fromisoformat(rules["validated_at"]) < timedelta(days=RULES_MAX_AGE_DAYS)
+
+
+def extend_schedule(schedule, rules, start=None, weeks=PREDICT_WEEKS):
+    """
+    Fill in days not covered by a scraped schedule with predicted collections.
+
+    Scraped days are kept as they are; only missing days are predicted and
+    marked with "predicted": true. Days predicted by an earlier call are
+    predicted again from the given rules. Days before the current week are dropped.
+
+    Args:
+        schedule (dict): The scraped schedule, possibly extended before.
+        rules (dict): Rules from infer_rules.
+        start (date): First day to predict, defaults to today.
+        weeks (int): Number of weeks to cover.
+
+    Returns:
+        dict: The combined schedule in the saved schedule format.
+    """
+    start = start or date.today()
+    scraped = {
+        daily_schedule["date"]: list(daily_schedule.get("collections", []))
+        for daily_schedules in schedule.values()
+        for daily_schedule in daily_schedules
+        if not daily_schedule.get("predicted")
+    }
+    days = predict_days(rules, start, start + timedelta(weeks=weeks) - timedelta(days=1))
+    predicted = set(days) - set(scraped)
+    days.update(scraped)
+    first_day = week_start(start).isoformat()
+    return group_by_week({d: collections for d, collections in days.items() if d >= first_day}, predicted)
+
+# ----------------------------
+# Main Execution
+# ----------------------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check rule inference accuracy on recorded history.")
+    parser.add_argument("history", nargs="?", default="collection_history.json",
+                        help="History file, or a saved weekly schedule (default: %(default)s)")
+    parser.add_argument("--holdout-weeks", type=int, default=0,
+                        help="Infer from all but the last N weeks and evaluate on those weeks only")
+    args = parser.parse_args(argv)
+
+    with open(args.history, "r") as f:
+        data = json.load(f)
+    is_weekly_schedule = any(days and isinstance(days[0], dict) for days in data.values())
+    history = flatten_schedule(data) if is_weekly_schedule else data
+
+    training, evaluation = split_history(history, args.holdout_weeks) if args.holdout_weeks else (history, history)
+
+    rules = infer_rules(training)
+    print(json.dumps(rules, indent=4))
+    result = evaluate_rules(rules, evaluation)
+    print(f"Accuracy: {result['correct']}/{result['days']} days ({result['accuracy']:.1%})")
+    for mismatch in result["mismatches"]:
+        print(f"  {mismatch['date']}: expected {mismatch['expected']}, predicted {mismatch['predicted']}")
+    return 0 if result["accuracy"] >= MIN_ACCURACY else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,163 @@
+# ----------------------------
+# Imports
+# ----------------------------
+
+import hashlib
+import json
+import logging
+import os
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread, Lock
+
+from dotenv import load_dotenv
+
+from src.handle_schedule import SCHEDULE_FILE, get_scraped_schedule, load_schedule
+
+load_dotenv()
+
+# ----------------------------
+# Configuration and Constants
+# ----------------------------
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+# "publish" serves this node's schedule, "subscribe" polls another node's
+SHARE_MODE = os.getenv("schedule_share_mode", "").lower()
+SHARE_URL = os.getenv("schedule_share_url", "")  # e.g. http://192.168.1.20:8322/schedule
+SHARE_HOST = os.getenv("schedule_share_host", "0.0.0.0")
+SHARE_PORT = int(os.getenv("schedule_share_port", "8322"))
+SHARE_TIMEOUT = 10  # Seconds to wait for the publishing node
+
+# Publisher: compact body and ETag, rebuilt only when the schedule file changes
+published_lock = Lock()
+published = {"mtime": None, "body": b"", "etag": ""}
+
+# Subscriber: ETag of the last schedule received from the publishing node
+last_etag = None
+
+# ----------------------------
+# Publisher
+# ----------------------------
+
+def get_published_schedule():
+    """
+    Get the compact schedule body and its ETag, re-encoding only if the file changed.
+
+    Only scraped days are published; subscribers make their own predictions.
+
+    Returns:
+        tuple: The JSON body (bytes) and its ETag, or (None, None) if there is no
+               readable schedule.
+    """
+    try:
+        mtime = SCHEDULE_FILE.stat().st_mtime
+    except FileNotFoundError:
+        return None, None
+
+    with published_lock:
+        if published["mtime"] != mtime:
+            try:
+                schedule = get_scraped_schedule(load_schedule())
+            except (OSError, ValueError) as e:
+                logger.error(f"Failed to read {SCHEDULE_FILE} for publishing: {e}")
+                return None, None
+            body = json.dumps(schedule, separators=(",", ":")).encode("utf-8")
+            published["mtime"] = mtime
+            published["body"] = body
+            published["etag"] = f'"{hashlib.sha1(body).hexdigest()}"'
+        return published["body"], published["etag"]
+
+
+class ScheduleShareHandler(BaseHTTPRequestHandler):
+    """
+    Serves GET /schedule with ETag / If-None-Match support.
+    """
+    def log_message(self, format, *args):
+        logger.debug(f"Schedule share: {format % args}")
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/schedule":
+            self.send_error(404)
+            return
+
+        body, etag = get_published_schedule()
+        if body is None:
+            self.send_error(503, "No schedule available yet")
+            return
+
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_schedule_share_server(host=SHARE_HOST, port=SHARE_PORT):
+    """
+    Publish this node's schedule to the LAN in a background thread.
+
+    Args:
+        host (str): Interface to listen on.
+        port (int): Port to listen on.
+
+    Returns:
+        ThreadingHTTPServer: The running server, or None if it could not be started.
+    """
+    try:
+        server = ThreadingHTTPServer((host, port), ScheduleShareHandler)
+    except OSError as e:
+        logger.error(f"Failed to start schedule share server on {host}:{port}: {e}")
+        return None
+
+    server.daemon_threads = True
+    Thread(target=server.serve_forever, name="schedule-share", daemon=True).start()
+    logger.info(f"Publishing schedule on http://{host}:{port}/schedule")
+    return server
+
+# ----------------------------
+# Subscriber
+# ----------------------------
+
+def fetch_shared_schedule(url=SHARE_URL):
+    """
+    Fetch the schedule from a publishing node.
+
+    A 304 Not Modified response means the local cache is already current,
+    so the scraped days of the locally saved schedule are returned.
+
+    Args:
+        url (str): URL of the publishing node's /schedule endpoint.
+
+    Returns:
+        dict: The collection schedule, or None if it could not be fetched.
+    """
+    global last_etag
+
+    request = urllib.request.Request(url)
+    if last_etag and SCHEDULE_FILE.exists():
+        request.add_header("If-None-Match", last_etag)
+
+    try:
+        with urllib.request.urlopen(request, timeout=SHARE_TIMEOUT) as response:
+            collections = json.loads(response.read())
+            last_etag = response.headers.get("ETag")
+            logger.info(f"Fetched shared schedule from {url}")
+            return collections
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            logger.info("Shared schedule not modified. Using local copy.")
+            return get_scraped_schedule(load_schedule())
+        logger.error(f"Failed to fetch shared schedule from {url}: {e}")
+    except (urllib.error.URLError, OSError, ValueError) as e:
+        logger.error(f"Failed to fetch shared schedule from {url}: {e}")
+    return None
@@ -0,0 +1,193 @@
+# ----------------------------
+# Imports
+# ----------------------------
+
+import logging
+
+# ----------------------------
+# Configuration and Constants
+# ----------------------------
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+# Each WS2812 data bit is sent as 3 SPI bits at 2.4 MHz (1.25 us per data bit):
+# a 0 bit is 100 (0.42 us high), a 1 bit is 110 (0.83 us high).
+SPI_BAUDRATE = 2_400_000
+BIT_ZERO = 0b100
+BIT_ONE = 0b110
+BYTES_PER_CHANNEL = 3
+
+# Trailing low bytes that latch the frame (>80 us at 2.4 MHz)
+RESET_BYTES = 32
+
+# ----------------------------
+# Encoding
+# ----------------------------
+
+def build_lut():
+    """
+    Build the lookup table from a channel value to its 3-byte SPI bit pattern.
+
+    Returns:
+        list: 256 bytes objects, one per channel value.
+    """
+    lut = []
+    for value in range(256):
+        pattern = 0
+        for bit in range(7, -1, -1):
+            pattern = (pattern << 3) | (BIT_ONE if (value >> bit) & 1 else BIT_ZERO)
+        lut.append(pattern.to_bytes(BYTES_PER_CHANNEL, "big"))
+    return lut
+
+
+LUT = build_lut()
+DECODE_LUT = {pattern: value for value, pattern in enumerate(LUT)}
+
+
+def decode_spi_frame(data, num_leds, pixel_order="GRB"):
+    """
+    Decode an SPI transfer back into pixel colors, e.g. from a fake SPI device.
+
+    Args:
+        data (bytes): Bytes written to the SPI bus.
+        num_leds (int): Number of pixels in the frame.
+        pixel_order (str): Channel order on the wire.
+
+    Returns:
+        list: RGB tuples, one per pixel.
+
+    Raises:
+        ValueError: If the data is not a valid encoded frame.
+    """
+    channels = len(pixel_order)
+    frame_length = num_leds * channels * BYTES_PER_CHANNEL
+    if len(data) < frame_length or any(data[frame_length:]):
+        raise ValueError("SPI data is not a complete frame followed by a low reset period")
+
+    pixels = []
+    for pixel in range(num_leds):
+        values = {}
+        for channel, name in enumerate(pixel_order):
+            offset = (pixel * channels + channel) * BYTES_PER_CHANNEL
+            pattern = bytes(data[offset:offset + BYTES_PER_CHANNEL])
+            if pattern not in DECODE_LUT:
+                raise ValueError(f"Invalid bit pattern {pattern.hex()} at byte {offset}")
+            values[name] = DECODE_LUT[pattern]
+        pixels.append((values["R"], values["G"], values["B"]))
+    return pixels
+
+# ----------------------------
+# SPI Pixel Strip
+# ----------------------------
+
+class SpiPixels:
+    """
+    Drop-in replacement for neopixel.NeoPixel that drives WS2812 LEDs over SPI MOSI.
+
+    Pixels are encoded into a reused transfer buffer as they are set, so show()
+    is a single SPI write with no per-frame encoding. Setting a pixel from a
+    3-tuple stores it as given; other sequences are copied into a tuple.
+    """
+    def __init__(self, spi, num_leds, brightness=1.0, auto_write=False, pixel_order="GRB", baudrate=SPI_BAUDRATE):
+        self.spi = spi
+        self.num_leds = num_leds
+        self.auto_write = auto_write
+        self.baudrate = baudrate
+        self.order = [pixel_order.index(name) for name in "RGB"]  # Wire position of R, G and B
+        self.stride = len(pixel_order) * BYTES_PER_CHANNEL
+        self.colors = [(0, 0, 0)] * num_leds
+        self.buffer = bytearray(num_leds * self.stride + RESET_BYTES)
+        self.scale = list(range(256))
+        self._brightness = 1.0
+        self.brightness = brightness
+
+    @property
+    def brightness(self):
+        return self._brightness
+
+    @brightness.setter
+    def brightness(self, value):
+        self._brightness = min(max(value, 0.0), 1.0)
+        self.scale = [int(v * self._brightness) for v in range(256)]
+        for index, color in enumerate(self.colors):
+            self.encode(index, color)
+        if self.auto_write:
+            self.show()
+
+    def __len__(self):
+        return self.num_leds
+
+    def __getitem__(self, index):
+        return self.colors[index]
+
+    def __setitem__(self, index, color):
+        if isinstance(index, slice):
+            for i, c in zip(range(*index.indices(self.num_leds)), color):
+                self.set_pixel(i, c)
+        else:
+            self.set_pixel(index, color)
+        if self.auto_write:
+            self.show()
+
+    def set_pixel(self, index, color):
+        """
+        Store and encode one pixel.
+
+        Args:
+            index (int): Pixel index.
+            color (tuple or int): RGB channels from 0 to 255, or a packed 0xRRGGBB value.
+
+        Raises:
+            ValueError: If a channel is outside 0-255.
+        """
+        if isinstance(color, int):
+            if not 0 <= color <= 0xFFFFFF:
+                raise ValueError(f"Packed color out of range: {color:#x}")
+            color = ((color >> 16) & 0xFF, (color >> 8) & 0xFF, color & 0xFF)
+        elif type(color) is not tuple or len(color) != 3:
+            color = tuple(color[:3])
+        r, g, b = color
+        if not (0 <= r <= 255 and 0 <= g <= 255 and 0 <= b <= 255):
+            raise ValueError(f"Color channels must be from 0 to 255: {color}")
+        self.colors[index] = color
+        self.encode(index, color)
+
+    def encode(self, index, color):
+        """
+        Write one pixel's bit patterns into the transfer buffer.
+        """
+        offset = index * self.stride
+        for channel, position in enumerate(self.order):
+            start = offset + position * BYTES_PER_CHANNEL
+            self.buffer[start:start + BYTES_PER_CHANNEL] = LUT[self.scale[color[channel]]]
+
+    def fill(self, color):
+        """
+        Set every pixel to one color, encoding it once and copying the pattern.
+        """
+        self.set_pixel(0, color)
+        color = self.colors[0]
+        pattern = self.buffer[0:self.stride]
+        for index in range(1, self.num_leds):
+            self.colors[index] = color
+            self.buffer[index * self.stride:(index + 1) * self.stride] = pattern
+        if self.auto_write:
+            self.show()
+
+    def show(self):
+        """
+        Send the encoded frame in a single SPI transfer.
+        """
+        while not self.spi.try_lock():
+            pass
+        try:
+            self.spi.configure(baudrate=self.baudrate, polarity=0, phase=0, bits=8)
+            self.spi.write(self.buffer)
+        finally:
+            self.spi.unlock()
+
+    def deinit(self):
+        self.fill((0, 0, 0))
+        self.show()
+        self.spi.deinit()
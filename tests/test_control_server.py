@@ -0,0 +1,138 @@
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src import control_server
+from src.handle_schedule import update_lock
+from src.led_configuration import animation_manager
+
+FADE_STATE = {"collections": ["garbage"], "base_color": [255, 255, 255], "steps": 10, "interval": 0.02}
+
+
+# Refresh function the running API calls, swapped in by the refresh fixture
+current_refresh = {}
+
+
+@pytest.fixture(scope="module")
+def api():
+    server = control_server.start_control_server(lambda: current_refresh["function"](), "127.0.0.1", 0)
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def refresh():
+    """A refresh that holds update_lock until released, counting how often it ran."""
+    state = {"runs": 0, "release": threading.Event()}
+
+    def refresh_function():
+        with update_lock:
+            state["runs"] += 1
+            state["release"].wait(5)
+
+    current_refresh["function"] = refresh_function
+    yield state
+    state["release"].set()
+    wait_for(lambda: not control_server.refresh_pending)
+
+
+def request(url, body=None, raw=None):
+    data = raw if raw is not None else (json.dumps(body).encode("utf-8") if body is not None else None)
+    method = "POST" if data is not None else "GET"
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, data=data, method=method)) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def wait_for(condition, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_status(api):
+    status, body = request(f"{api}/status")
+    assert status == 200
+    assert {"animation", "params", "overlays", "refresh_in_progress", "cache"} <= set(body)
+    assert body["refresh_in_progress"] is False
+
+
+def test_refresh_conflicts_while_running(api, refresh):
+    assert request(f"{api}/refresh", {})[0] == 202
+    assert wait_for(lambda: refresh["runs"] == 1)
+    assert request(f"{api}/status")[1]["refresh_in_progress"] is True
+    assert request(f"{api}/refresh", {})[0] == 409
+
+    refresh["release"].set()
+    assert wait_for(lambda: not request(f"{api}/status")[1]["refresh_in_progress"])
+    assert refresh["runs"] == 1
+
+
+def test_refresh_conflicts_with_other_updates(api, refresh):
+    # e.g. the daily run or startup holding the lock
+    with update_lock:
+        assert request(f"{api}/refresh", {})[0] == 409
+    assert refresh["runs"] == 0
+
+
+def test_concurrent_refreshes_start_once(api, refresh):
+    with ThreadPoolExecutor(5) as executor:
+        statuses = sorted(executor.map(lambda _: request(f"{api}/refresh", {})[0], range(5)))
+    assert statuses == [202, 409, 409, 409, 409]
+
+    refresh["release"].set()
+    assert wait_for(lambda: not request(f"{api}/status")[1]["refresh_in_progress"])
+    assert refresh["runs"] == 1
+
+
+@pytest.mark.parametrize("body", [
+    {"name": "no_such_animation"},
+    {"name": "fade_to_color", "params": "x"},
+    {"name": "fade_to_color", "params": {"fade_state": {}}},
+    {"name": "fade_to_color", "params": {"fade_state": {**FADE_STATE, "base_color": [300, 0, 0]}}},
+    {"name": "fade_to_color", "params": {"fade_state": {**FADE_STATE, "steps": 10 ** 7, "interval": 1e-9}}},
+    {"name": "set_leds", "params": {"collection_state": {"garbage_on": True}}},
+    {"name": "", "duration": "abc"},
+    {"name": "", "duration": 1e308},
+])
+def test_bad_preview_is_rejected(api, body):
+    before = animation_manager.get_animation()
+    assert request(f"{api}/preview", body)[0] == 400
+    assert animation_manager.get_animation() == before
+
+
+@pytest.mark.parametrize("path, body", [
+    ("/overlay", {"name": "no_such_overlay"}),
+    ("/overlay", {"name": ["heartbeat"]}),
+    ("/overlay", {"name": "heartbeat", "opacity": "x"}),
+    ("/overlay", {"name": "heartbeat", "opacity": 2}),
+    ("/debug/profile", {"seconds": "abc"}),
+    ("/debug/profile", {"seconds": -1}),
+])
+def test_bad_overlay_and_profile_bodies_are_rejected(api, path, body):
+    assert request(f"{api}{path}", body)[0] == 400
+
+
+@pytest.mark.parametrize("raw", [b"[1, 2]", b"{not json"])
+def test_non_object_body_is_rejected(api, raw):
+    assert request(f"{api}/overlay", raw=raw)[0] == 400
+
+
+def test_new_preview_cancels_previous_timer(api, monkeypatch):
+    restored = threading.Event()
+    monkeypatch.setattr(control_server, "update_leds_today", restored.set)
+
+    assert request(f"{api}/preview", {"name": "set_holiday_lights", "duration": 0.1})[0] == 200
+    assert request(f"{api}/preview", {"name": "fade_to_color", "params": {"fade_state": FADE_STATE}})[0] == 200
+
+    assert not restored.wait(0.3)
+    assert animation_manager.get_animation()[0] == "fade_to_color"
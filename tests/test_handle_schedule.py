@@ -0,0 +1,50 @@
+import json
+from datetime import date, timedelta
+
+import pytest
+
+from src import handle_schedule
+
+
+@pytest.fixture
+def history_file(tmp_path, monkeypatch):
+    path = tmp_path / "collection_history.json"
+    monkeypatch.setattr(handle_schedule, "HISTORY_FILE", path)
+    return path
+
+
+def scraped_week(monday, collections):
+    return {monday.isoformat(): [
+        {"date": (monday + timedelta(days=i)).isoformat(), "collections": collections if i == 1 else []}
+        for i in range(7)
+    ]}
+
+
+def test_update_history_ignores_predicted_days(history_file):
+    monday = date(2026, 10, 12)
+    schedule = scraped_week(monday, ["trash"])
+    schedule[monday.isoformat()].append({"date": "2026-10-19", "collections": ["trash"], "predicted": True})
+
+    history = handle_schedule.update_history(schedule)
+
+    assert sorted(history) == [(monday + timedelta(days=i)).isoformat() for i in range(7)]
+    assert json.loads(history_file.read_text()) == history
+
+
+def test_update_history_drops_days_outside_window(history_file):
+    latest = date(2026, 10, 12)
+    cutoff = latest + timedelta(days=6) - timedelta(weeks=handle_schedule.HISTORY_MAX_WEEKS)
+    old = {
+        (cutoff - timedelta(days=1)).isoformat(): ["trash"],
+        cutoff.isoformat(): [],
+        (cutoff + timedelta(days=1)).isoformat(): ["holiday"],
+    }
+    history_file.write_text(json.dumps(old))
+
+    history = handle_schedule.update_history(scraped_week(latest, ["trash"]))
+
+    assert (cutoff - timedelta(days=1)).isoformat() not in history
+    assert cutoff.isoformat() not in history
+    assert history[(cutoff + timedelta(days=1)).isoformat()] == ["holiday"]
+    assert history[(latest + timedelta(days=1)).isoformat()] == ["trash"]
+    assert json.loads(history_file.read_text()) == history
@@ -0,0 +1,116 @@
+import threading
+import time
+
+import pytest
+
+from benchmarks.fake_hardware import FakeSPI
+from src import led_configuration
+from src.spi_pixels import SpiPixels, decode_spi_frame
+
+
+class FailingPixels(SpiPixels):
+    """
+    SpiPixels whose show() raises while the first pixel is set to fail_on.
+    """
+    fail_on = (1, 2, 3)
+
+    def show(self):
+        if self.colors[0] == self.fail_on:
+            raise RuntimeError("SPI write failed")
+        super().show()
+
+
+@pytest.fixture
+def spi_strip(monkeypatch):
+    spi = FakeSPI()
+    strip = FailingPixels(spi, led_configuration.NUM_LEDS)
+    monkeypatch.setattr(led_configuration, "pixels", strip)
+    led_configuration.shown_frame[:] = [None] * led_configuration.NUM_LEDS
+    return spi
+
+
+def test_failing_animation_turns_leds_off_and_loop_keeps_running(spi_strip, monkeypatch):
+    monkeypatch.setitem(led_configuration.ANIMATIONS, "broken", lambda params, show_log: {"all": FailingPixels.fail_on})
+    manager = led_configuration.animation_manager
+
+    if not any(thread.name == led_configuration.ANIMATION_THREAD_NAME for thread in threading.enumerate()):
+        led_configuration.start_animation_thread()
+
+    manager.set_animation("set_holiday_lights", {})
+    assert manager.wait_for_render(timeout=5) is not None
+
+    manager.set_animation("broken", {})
+    for _ in range(50):
+        if manager.rendered_animation == '':
+            break
+        time.sleep(0.02)
+    assert manager.rendered_animation == ''
+    off = [led_configuration.COLOR_OFF] * led_configuration.NUM_LEDS
+    assert decode_spi_frame(spi_strip.writes[-1], led_configuration.NUM_LEDS) == off
+
+    manager.set_animation("set_holiday_lights", {})
+    assert manager.wait_for_render(timeout=5) is not None
+    assert decode_spi_frame(spi_strip.writes[-1], led_configuration.NUM_LEDS) == \
+        [led_configuration.COLOR_HOLIDAY] * led_configuration.NUM_LEDS
+
+
+def test_failing_layer_clears_animation_and_overlays(spi_strip, monkeypatch):
+    def failing_frames():
+        yield (0, 0, 255)
+        raise RuntimeError("generator failed")
+
+    monkeypatch.setitem(led_configuration.ANIMATIONS, "broken", lambda params, show_log: {"all": failing_frames()})
+    manager = led_configuration.animation_manager
+
+    if not any(thread.name == led_configuration.ANIMATION_THREAD_NAME for thread in threading.enumerate()):
+        led_configuration.start_animation_thread()
+
+    manager.set_animation("set_holiday_lights", {})
+    assert manager.wait_for_render(timeout=5) is not None
+    manager.set_overlay("heartbeat")
+
+    manager.set_animation("broken", {"a": 1})
+    for _ in range(50):
+        if manager.get_animation() == ('', {}):
+            break
+        time.sleep(0.02)
+    assert manager.get_animation() == ('', {})
+    assert manager.rendered_animation == ''
+    assert manager.get_overlays() == []
+    off = [led_configuration.COLOR_OFF] * led_configuration.NUM_LEDS
+    assert decode_spi_frame(spi_strip.writes[-1], led_configuration.NUM_LEDS) == off
+
+
+def test_50ms_steps_keep_their_duration_at_50fps():
+    # 2 * 51 pulse levels of 50 ms each is one 5.1 second breath
+    steps = list(led_configuration.timed(range(102), 0.05))
+    assert len(steps) * led_configuration.FRAME_INTERVAL == pytest.approx(102 * 0.05)
+    assert {steps.count(step) for step in range(102)} == {2, 3}
+
+    cycle = led_configuration.ticks(102 * 0.05)
+    frames = led_configuration.pulse((255, 255, 255))
+    assert [next(frames) for _ in range(cycle)] == [next(frames) for _ in range(cycle)]
+
+
+def test_blink_lasts_its_full_duration():
+    frames = list(led_configuration.blink((255, 0, 0), 5, 0.05))
+    assert len(frames) == led_configuration.ticks(10 * 0.05)
+
+
+def test_wait_for_render_waits_for_latest_animation():
+    manager = led_configuration.AnimationManager()
+    manager.set_animation("set_holiday_lights", {"a": 1})
+    name, params = manager.get_animation()
+    assert manager.wait_for_render(timeout=0.01) is None
+
+    # A render of parameters that have since been replaced doesn't count
+    manager.set_animation("set_holiday_lights", {"a": 2})
+    manager.mark_rendered(name, params)
+    assert manager.wait_for_render(timeout=0.01) is None
+    assert manager.rendered_animation == "set_holiday_lights"
+
+    name, params = manager.get_animation()
+    threading.Timer(0.05, manager.mark_rendered, (name, params)).start()
+    rendered_at = manager.wait_for_render(timeout=2)
+    assert rendered_at is not None
+    assert rendered_at <= time.monotonic()
@@ -0,0 +1,107 @@
+import importlib
+import json
+import threading
+from datetime import date, timedelta
+
+import pytest
+
+from benchmarks.run_benchmarks import make_schedule
+from src import led_configuration
+from src.handle_schedule import SCHEDULE_FILE, save_schedule
+
+
+@pytest.fixture
+def main(tmp_path, monkeypatch):
+    # main logs to a file and keeps its schedule files in the working directory
+    monkeypatch.chdir(tmp_path)
+    module = importlib.import_module("main")
+    monkeypatch.setattr(led_configuration, "load_schedule", lambda: json.loads(SCHEDULE_FILE.read_text()))
+    return module
+
+
+def this_week():
+    today = date.today()
+    return make_schedule(today - timedelta(days=today.weekday()), weeks=2)
+
+
+def empty_weeks():
+    today = date.today()
+    return {today.isoformat(): [{"date": today.isoformat(), "collections": []}]}
+
+
+def test_empty_fetch_keeps_cached_schedule_and_display(main, monkeypatch):
+    cached = this_week()
+    save_schedule(cached)
+    monkeypatch.setattr(main, "fetch_collections", empty_weeks)
+    led_configuration.animation_manager.set_animation("set_holiday_lights", {})
+
+    main.fetch_or_load_and_update_leds(force_fetch=True, cached_collections=cached)
+
+    assert json.loads(SCHEDULE_FILE.read_text()) == cached
+    assert led_configuration.animation_manager.get_animation()[0] == "set_holiday_lights"
+
+
+def test_empty_fetch_without_cache_signals_failure(main, monkeypatch):
+    monkeypatch.setattr(main, "fetch_collections", empty_weeks)
+
+    main.fetch_or_load_and_update_leds(force_fetch=True)
+
+    assert led_configuration.animation_manager.get_animation()[0] == "blink_red_and_turn_off"
+
+
+def run_startup(main):
+    main.run_startup_process().join(timeout=5)
+
+
+def test_fallback_boot_skips_metric_when_fetch_sets_nothing(main, monkeypatch):
+    yesterday = (date.today() - timedelta(days=1)).isoformat()
+    past_only = {yesterday: [{"date": yesterday, "collections": ["garbage"]}]}
+    monkeypatch.setattr(main, "fetch_collections", lambda: past_only)
+    measured = []
+    monkeypatch.setattr(main, "log_time_to_first_frame", lambda: measured.append(True))
+
+    run_startup(main)
+
+    assert led_configuration.animation_manager.get_animation()[0] == "pulsate_white"
+    assert measured == []
+
+
+def test_fast_boot_shows_cached_schedule_before_fetching(main, monkeypatch, caplog):
+    if not any(thread.name == led_configuration.ANIMATION_THREAD_NAME for thread in threading.enumerate()):
+        led_configuration.start_animation_thread()
+    cached = this_week()
+    save_schedule(cached)
+    shown_while_fetching = []
+
+    def fetch_collections():
+        shown_while_fetching.append(led_configuration.animation_manager.rendered_animation)
+        return cached
+
+    monkeypatch.setattr(main, "fetch_collections", fetch_collections)
+    led_configuration.animation_manager.set_animation('')
+    caplog.set_level("INFO", logger="main")
+
+    run_startup(main)
+
+    name, params = led_configuration.animation_manager.get_animation()
+    assert name in ("set_leds", "fade_to_color", "set_holiday_lights")
+    assert shown_while_fetching == [name]
+    assert "Time to first correct frame" in caplog.text
+    assert "Schedule unchanged from cached copy" in caplog.text
+
+
+@pytest.mark.parametrize("shared, expected", [
+    (this_week(), "shared"),
+    (make_schedule(date(2025, 1, 6), weeks=4), "scraped"),
+    (None, "scraped"),
+])
+def test_subscriber_only_accepts_shared_schedule_covering_today(main, monkeypatch, shared, expected):
+    monkeypatch.setattr(main, "SHARE_MODE", "subscribe")
+    monkeypatch.setattr(main, "SHARE_URL", "http://publisher.invalid/schedule")
+    monkeypatch.setattr(main, "fetch_shared_schedule", lambda url: shared)
+    scraped = this_week()
+    monkeypatch.setattr(main, "scrape_with_playwright", lambda: scraped)
+
+    result = main.fetch_collections()
+
+    assert result is (shared if expected == "shared" else scraped)
@@ -0,0 +1,72 @@
+import re
+import sys
+import threading
+import traceback
+from pathlib import Path
+
+import pytest
+
+from src import profiling
+from src.led_configuration import animation_manager
+from src.profiling import SamplingProfiler, collapse_stack, dump_thread_stacks, frame_label
+
+# A thread name no real animation thread left over from other tests can have
+BUSY_THREAD_NAME = "test animations"
+
+# thread;module:function;... count
+FOLDED_LINE = re.compile(r"^[^ ;]+(;[^ ;]+:[^ ;]+)* \d+$")
+
+
+@pytest.fixture
+def busy_thread(monkeypatch):
+    monkeypatch.setattr(profiling, "ANIMATION_THREAD_NAME", BUSY_THREAD_NAME)
+    monkeypatch.setattr(animation_manager, "rendered_animation", "busy")
+    stop = threading.Event()
+
+    def spin():
+        while not stop.is_set():
+            pass
+
+    thread = threading.Thread(target=spin, name=BUSY_THREAD_NAME, daemon=True)
+    thread.start()
+    yield thread
+    stop.set()
+    thread.join(timeout=5)
+
+
+def test_collapse_stack_matches_traceback():
+    frame = sys._getframe()
+    expected = [f"{frame_label(Path(f.filename).stem)}:{f.name}" for f in traceback.extract_stack(frame)]
+    assert collapse_stack(frame) == expected
+
+
+def test_busy_animation_thread_cpu_share(tmp_path, busy_thread):
+    profiler = SamplingProfiler(output_dir=tmp_path, interval=0.005)
+    assert profiler.start(0.3)
+    profiler.thread.join(timeout=5)
+
+    result = profiler.last_result
+    assert list(result["animations"]) == ["busy"]
+    stats = result["animations"]["busy"]
+    assert stats["wall_seconds"] == pytest.approx(result["seconds"], abs=0.05)
+    # The spinning thread shares the GIL with the sampler, so it can't reach a full core
+    assert 30.0 < stats["cpu_percent"] <= 100.0
+
+
+def test_folded_file_is_collapsed_stack_format(tmp_path, busy_thread):
+    profiler = SamplingProfiler(output_dir=tmp_path, interval=0.005)
+    assert profiler.start(0.1)
+    profiler.thread.join(timeout=5)
+
+    lines = Path(profiler.last_result["path"]).read_text().splitlines()
+    assert lines
+    for line in lines:
+        assert FOLDED_LINE.match(line), line
+    assert any(line.startswith("test_animations[busy];") and "test_profiling:spin " in line for line in lines)
+
+
+def test_dump_thread_stacks(busy_thread):
+    dump = dump_thread_stacks()
+    assert f'Thread "{BUSY_THREAD_NAME}" (id {busy_thread.ident}, daemon=True):' in dump
+    assert f'Thread "MainThread" (id {threading.main_thread().ident}, daemon=False):' in dump
+    assert "in spin" in dump
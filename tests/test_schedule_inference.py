@@ -0,0 +1,83 @@
+import json
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+from src.get_collection_information import parse_calendar_html
+from src.schedule_inference import (
+    MIN_ACCURACY, evaluate_rules, flatten_schedule, infer_rules, predict_days, rules_are_trusted, split_history,
+)
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def recorded_history():
+    """January 2025 as scraped: holidays on Jan 1 and Jan 20 (MLK Day), recycling every other week."""
+    with open(ROOT / "collection_schedule.json", "r") as f:
+        return flatten_schedule(json.load(f))
+
+
+@pytest.fixture
+def parsed_history():
+    """Saved February 2025 calendar page: holiday on Feb 17 (Presidents' Day), recycling every other week."""
+    content = (ROOT / "benchmarks" / "fixtures" / "calendar_month.html").read_text()
+    return flatten_schedule(parse_calendar_html(content))
+
+
+def test_holdout_on_recorded_schedule(recorded_history):
+    training, evaluation = split_history(recorded_history, holdout_weeks=1)
+    assert max(training) < min(evaluation)
+
+    rules = infer_rules(training)
+    result = evaluate_rules(rules, evaluation)
+
+    assert result["mismatches"] == []
+    assert result["accuracy"] >= MIN_ACCURACY
+
+
+def test_holdout_on_parsed_calendar_keeps_biweekly_phase(parsed_history):
+    training, evaluation = split_history(parsed_history, holdout_weeks=2)
+    rules = infer_rules(training)
+    assert rules["types"]["recycling"]["interval_weeks"] == 2
+    assert rules["types"]["garbage"]["interval_weeks"] == 1
+
+    result = evaluate_rules(rules, evaluation)
+    assert result["mismatches"] == []
+
+    predicted = predict_days(rules, date(2025, 2, 24), date(2025, 3, 9))
+    assert "recycling" in predicted["2025-02-26"]
+    assert "recycling" not in predicted["2025-03-05"]
+    assert "garbage" in predicted["2025-03-05"]
+
+
+def test_holiday_shift_learned_from_one_holiday_applies_to_another(recorded_history, parsed_history):
+    # Learned from Presidents' Day pushing collection to Thursday, checked on
+    # New Year's Day 2025 (Wednesday), which the rules never saw
+    rules = infer_rules(parsed_history)
+    assert rules["holiday_shift_days"] == 1
+
+    evaluation = {d: c for d, c in recorded_history.items() if d < "2025-01-20"}
+    result = evaluate_rules(rules, evaluation)
+
+    assert result["mismatches"] == []
+    assert evaluation["2025-01-02"] == ["garbage", "organics", "recycling"]
+
+
+def test_recorded_holiday_shifts_next_years_collection(recorded_history):
+    rules = infer_rules(recorded_history)
+    assert "mlk_day" in rules["holidays"]
+
+    predicted = predict_days(rules, date(2026, 1, 19), date(2026, 1, 25))
+    assert predicted["2026-01-19"] == ["holiday"]
+    assert predicted["2026-01-21"] == []
+    assert sorted(predicted["2026-01-22"]) == ["garbage", "organics"]
+
+
+def test_rules_from_a_single_month_are_not_trusted(recorded_history):
+    rules = infer_rules(recorded_history)
+    rules["accuracy"] = 1.0
+    rules["validated_at"] = "2025-02-01T06:00:00"
+
+    assert not rules_are_trusted(rules)
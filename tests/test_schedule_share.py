@@ -0,0 +1,95 @@
+import json
+import os
+import urllib.error
+import urllib.request
+
+import pytest
+
+from src import handle_schedule, schedule_share
+
+SCHEDULE = {
+    "2025-01-27": [
+        {"date": "2025-01-28", "collections": []},
+        {"date": "2025-01-29", "collections": ["garbage", "organics", "recycling"]},
+    ],
+    "2025-02-03": [
+        {"date": "2025-02-05", "collections": ["garbage", "organics"], "predicted": True},
+    ],
+}
+SCRAPED = {"2025-01-27": SCHEDULE["2025-01-27"]}
+
+
+@pytest.fixture
+def schedule_file(tmp_path, monkeypatch):
+    path = tmp_path / "collection_schedule.json"
+    monkeypatch.setattr(handle_schedule, "SCHEDULE_FILE", path)
+    monkeypatch.setattr(schedule_share, "SCHEDULE_FILE", path)
+    monkeypatch.setattr(schedule_share, "published", {"mtime": None, "body": b"", "etag": ""})
+    monkeypatch.setattr(schedule_share, "last_etag", None)
+    return path
+
+
+@pytest.fixture
+def share_url(schedule_file):
+    server = schedule_share.start_schedule_share_server("127.0.0.1", 0)
+    yield f"http://127.0.0.1:{server.server_address[1]}/schedule"
+    server.shutdown()
+    server.server_close()
+
+
+def get_status(url, etag=None):
+    request = urllib.request.Request(url)
+    if etag:
+        request.add_header("If-None-Match", etag)
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def test_publishes_scraped_days_with_etag(share_url):
+    handle_schedule.save_schedule(SCHEDULE)
+
+    assert schedule_share.fetch_shared_schedule(share_url) == SCRAPED
+    etag = schedule_share.last_etag
+    assert etag
+    assert get_status(share_url, etag) == 304
+    assert get_status(share_url, '"stale"') == 200
+
+
+def test_not_modified_returns_scraped_days_of_local_copy(share_url):
+    handle_schedule.save_schedule(SCHEDULE)
+    schedule_share.fetch_shared_schedule(share_url)
+
+    # The subscriber has since extended its copy with predictions of its own
+    handle_schedule.save_schedule(SCHEDULE)
+    assert schedule_share.fetch_shared_schedule(share_url) == SCRAPED
+
+
+def test_changed_schedule_gets_new_etag(share_url, schedule_file):
+    handle_schedule.save_schedule(SCHEDULE)
+    schedule_share.fetch_shared_schedule(share_url)
+    first_etag = schedule_share.last_etag
+
+    changed = {"2025-02-10": [{"date": "2025-02-12", "collections": ["garbage"]}]}
+    handle_schedule.save_schedule(changed)
+    os.utime(schedule_file, ns=(0, 0))  # Guarantee a new mtime on coarse filesystems
+
+    assert schedule_share.fetch_shared_schedule(share_url) == changed
+    assert schedule_share.last_etag != first_etag
+
+
+def test_missing_or_unreadable_schedule_is_unavailable(share_url, schedule_file):
+    assert get_status(share_url) == 503
+    assert schedule_share.fetch_shared_schedule(share_url) is None
+
+    schedule_file.write_text('{"2025-01-27": [')
+    assert get_status(share_url) == 503
+    assert schedule_share.fetch_shared_schedule(share_url) is None
+
+
+def test_save_schedule_replaces_file_atomically(schedule_file):
+    handle_schedule.save_schedule(SCHEDULE)
+    assert json.loads(schedule_file.read_text()) == SCHEDULE
+    assert [path.name for path in schedule_file.parent.iterdir()] == [schedule_file.name]
@@ -0,0 +1,80 @@
+import pytest
+
+from benchmarks.fake_hardware import FakeSPI
+from src.spi_pixels import BYTES_PER_CHANNEL, LUT, RESET_BYTES, SpiPixels, decode_spi_frame
+
+
+@pytest.fixture
+def spi():
+    return FakeSPI()
+
+
+def test_channels_are_sent_in_grb_order(spi):
+    strip = SpiPixels(spi, 2)
+    strip[1] = (10, 20, 30)
+    strip.show()
+
+    data = spi.writes[-1]
+    pixel = data[3 * BYTES_PER_CHANNEL:6 * BYTES_PER_CHANNEL]
+    assert pixel == LUT[20] + LUT[10] + LUT[30]
+    assert decode_spi_frame(data, 2) == [(0, 0, 0), (10, 20, 30)]
+
+
+def test_rgb_pixel_order(spi):
+    strip = SpiPixels(spi, 1, pixel_order="RGB")
+    strip[0] = 0x0A141E
+    strip.show()
+
+    assert spi.writes[-1][:3 * BYTES_PER_CHANNEL] == LUT[10] + LUT[20] + LUT[30]
+    assert decode_spi_frame(spi.writes[-1], 1, pixel_order="RGB") == [(10, 20, 30)]
+
+
+def test_brightness_scales_encoded_frame_but_not_stored_colors(spi):
+    strip = SpiPixels(spi, 2, brightness=0.5)
+    strip[0] = (200, 100, 51)
+    strip.show()
+    assert decode_spi_frame(spi.writes[-1], 2) == [(100, 50, 25), (0, 0, 0)]
+    assert strip[0] == (200, 100, 51)
+
+    strip.brightness = 1.0
+    strip.show()
+    assert decode_spi_frame(spi.writes[-1], 2) == [(200, 100, 51), (0, 0, 0)]
+
+
+def test_slice_assignment(spi):
+    strip = SpiPixels(spi, 4)
+    strip[1:3] = [(1, 2, 3), (4, 5, 6)]
+    strip.show()
+
+    assert decode_spi_frame(spi.writes[-1], 4) == [(0, 0, 0), (1, 2, 3), (4, 5, 6), (0, 0, 0)]
+
+
+def test_fill_sets_every_pixel(spi):
+    strip = SpiPixels(spi, 5)
+    strip[2] = (9, 9, 9)
+    strip.fill((255, 0, 128))
+    strip.show()
+
+    assert decode_spi_frame(spi.writes[-1], 5) == [(255, 0, 128)] * 5
+    assert list(strip.colors) == [(255, 0, 128)] * 5
+
+
+def test_frame_ends_with_low_reset_tail(spi):
+    strip = SpiPixels(spi, 3)
+    strip.fill((255, 255, 255))
+    strip.show()
+
+    data = spi.writes[-1]
+    assert len(data) == 3 * 3 * BYTES_PER_CHANNEL + RESET_BYTES
+    assert data[-RESET_BYTES:] == bytes(RESET_BYTES)
+
+    with pytest.raises(ValueError):
+        decode_spi_frame(data[:-1] + b"\x01", 3)
+
+
+@pytest.mark.parametrize("color", [(-1, 0, 0), (0, 256, 0), (0, 0, 300), -1, 0x1000000])
+def test_out_of_range_colors_are_rejected(spi, color):
+    strip = SpiPixels(spi, 1)
+    with pytest.raises(ValueError):
+        strip[0] = color
+    assert strip[0] == (0, 0, 0)